@@ -0,0 +1,43 @@
+"""Add posts feed keyset index
+
+Revision ID: 3b9e2c7d1f40
+Revises: 64e164614d85
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b9e2c7d1f40"
+down_revision: Union[str, Sequence[str], None] = "64e164614d85"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY does not block writes, but cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_posts_author_created_at_id",
+            "posts",
+            ["author_user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            unique=False,
+            postgresql_where=sa.text("is_active = true"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_posts_author_created_at_id",
+            table_name="posts",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,54 @@
+"""Add users search keyset index
+
+Revision ID: 8d4f1a6b2e93
+Revises: 3b9e2c7d1f40
+Create Date: 2026-10-18 14:05:27.641930
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d4f1a6b2e93"
+down_revision: Union[str, Sequence[str], None] = "3b9e2c7d1f40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY does not block writes, but cannot run in a transaction
+    with op.get_context().autocommit_block():
+        # Superseded: it serves the prefix filter but not the ORDER BY
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_users_search_lower")
+        op.create_index(
+            "ix_users_search_keyset",
+            "users",
+            [
+                sa.text('lower(first_name) COLLATE "C"'),
+                sa.text('lower(second_name) COLLATE "C"'),
+                "id",
+            ],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_users_search_keyset",
+            table_name="users",
+            postgresql_concurrently=True,
+        )
+        # Restore the prefix search index dropped by upgrade (see hw/hw2)
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_search_lower "
+            "ON users (lower(first_name) varchar_pattern_ops, "
+            "lower(second_name) varchar_pattern_ops)"
+        )
@@ -0,0 +1,51 @@
+"""Add trigram and full-text search indexes
+
+Revision ID: c5a7e9d3b218
+Revises: 8d4f1a6b2e93
+Create Date: 2026-10-18 16:42:09.275316
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c5a7e9d3b218"
+down_revision: Union[str, Sequence[str], None] = "8d4f1a6b2e93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY does not block writes, but cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY ix_users_full_name_trgm ON users "
+            "USING gin ((first_name || ' ' || second_name) gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY ix_users_biography_fts ON users "
+            "USING gin (to_tsvector('russian', biography))"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY ix_posts_text_fts ON posts "
+            "USING gin (to_tsvector('russian', text))"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_posts_text_fts", table_name="posts", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_users_biography_fts", table_name="users", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_users_full_name_trgm", table_name="users", postgresql_concurrently=True
+        )
@@ -0,0 +1,41 @@
+"""Add friends active index
+
+Revision ID: e1b8c4f7a352
+Revises: c5a7e9d3b218
+Create Date: 2026-10-18 18:20:53.904417
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e1b8c4f7a352"
+down_revision: Union[str, Sequence[str], None] = "c5a7e9d3b218"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY does not block writes, but cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_friends_active",
+            "friends",
+            ["user_id", "friend_id"],
+            unique=False,
+            postgresql_where=sa.text("is_active = true"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_friends_active", table_name="friends", postgresql_concurrently=True
+        )
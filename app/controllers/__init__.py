@@ -2,5 +2,12 @@ from .user_controller import router as user_router
 from .auth_controller import router as auth_router
 from .websocket_controller import router as websocket_router
 from .messages_controller import router as messages_router
+from .metrics_controller import router as metrics_router
 
-__all__ = ["user_router", "auth_router", "websocket_router", "messages_router"]
+__all__ = [
+    "user_router",
+    "auth_router",
+    "websocket_router",
+    "messages_router",
+    "metrics_router",
+]
@@ -4,10 +4,12 @@ from fastapi import APIRouter, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.auth import LoginResponse, UserLogin
 from app.core.dependencies import get_read_db
+from app.core.rate_limiter import limit_by_ip, rate_limiter
 from app.services.auth_service import AuthService
 from app.logger import logger
 from app.core.exceptions import AppError
 from app.resources import strings
+from app.settings import settings
 
 router = APIRouter(tags=["Auth"])
 
@@ -16,12 +18,22 @@ async def get_auth_service(db: AsyncSession = Depends(get_read_db)) -> AuthServi
     return AuthService(db)
 
 
-@router.post("/login", response_model=LoginResponse, status_code=status.HTTP_200_OK)
+@router.post(
+    "/login",
+    response_model=LoginResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_by_ip("login", settings.RATE_LIMIT_LOGIN_IP))],
+)
 async def login(
     credentials: UserLogin, service: AuthService = Depends(get_auth_service)
 ) -> LoginResponse:
     logger.info(f"user_id: {credentials.id}")
 
+    # Password guessing against one account from many addresses
+    await rate_limiter.check(
+        "login:user", str(credentials.id), settings.RATE_LIMIT_LOGIN_USER
+    )
+
     login_response = await service.login(credentials)
     if not login_response:
         raise AppError(strings.PASS_OR_LOGIN_ERROR_MSG, status.HTTP_401_UNAUTHORIZED)
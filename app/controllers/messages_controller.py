@@ -1,7 +1,10 @@
+import httpx
 from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator
 from uuid import UUID
 from pydantic import BaseModel
-from app.core.messages_client import MessagesClient
+from app.core.messages_client import MessagesClient, messages_client
 from app.core.dependencies import get_current_user
 from app.core.jwt_token import get_token_from_request
 from app.logger import logger
@@ -9,13 +12,49 @@ from app.logger import logger
 
 router = APIRouter(prefix="/dialog", tags=["Messages"])
 
+# Connection-level headers of the upstream response, ours are set by the server
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+    "date",
+    "server",
+}
+
 
 class MessageCreate(BaseModel):
     text: str
 
 
 def get_messages_client() -> MessagesClient:
-    return MessagesClient()
+    return messages_client
+
+
+async def iter_body(response: httpx.Response) -> AsyncIterator[bytes]:
+    # Closing returns the connection to the pool, also if our client goes away
+    try:
+        async for chunk in response.aiter_raw():
+            yield chunk
+    finally:
+        await response.aclose()
+
+
+def stream_response(response: httpx.Response) -> StreamingResponse:
+    """Pass the messages-service response through without decoding the body."""
+    return StreamingResponse(
+        iter_body(response),
+        status_code=response.status_code,
+        headers={
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        },
+    )
 
 
 @router.post("/{user_id}/send")
@@ -34,7 +73,14 @@ async def send_message(
         f"request_id={request_id} | Proxying send message from {current_user['user_id']} to {user_id}"
     )
 
-    return await client.send_message(user_id, message.text, token, request_id)
+    response = await client.send_message(
+        user_id,
+        message.text,
+        token,
+        request_id,
+        request.headers.get("accept-encoding", "identity"),
+    )
+    return stream_response(response)
 
 
 @router.get("/{user_id}/list")
@@ -52,4 +98,7 @@ async def get_messages(
         f"request_id={request_id} | Proxying get messages for {current_user['user_id']} with {user_id}"
     )
 
-    return await client.get_messages(user_id, token, request_id)
+    response = await client.get_messages(
+        user_id, token, request_id, request.headers.get("accept-encoding", "identity")
+    )
+    return stream_response(response)
@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from app.core.jwt_token import verified_tokens
+from app.core.local_cache import local_cache
+from app.core.messages_client import messages_client
+from app.core.password_pool import password_pool
+from app.services.search_index import search_index
+from app.services.friend_graph import friend_graph
+
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("")
+async def get_metrics():
+    """In-process cache and pool statistics of this instance"""
+    return {
+        "local_cache": local_cache.stats(),
+        "search_index": search_index.stats(),
+        "friend_graph": friend_graph.stats(),
+        "password_pool": password_pool.stats(),
+        "jwt_cache": verified_tokens.stats(),
+        "messages_client": messages_client.stats(),
+    }
@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.dependencies import get_write_db, get_read_db
 from app.services.user_service import UserService
-from app.schemas.user import UserCreate, UserRegisterResponse, UserResponse
+from app.schemas.user import (
+    FriendsBulkRequest,
+    FriendsBulkResponse,
+    FriendSuggestion,
+    UserCreate,
+    UserRegisterResponse,
+    UserResponse,
+)
 from app.schemas.post import PostCreate, PostResponse, PostUpdate
 from app.logger import logger
+from app.settings import settings
 from app.core.exceptions import AppError
 from app.resources import strings
 from uuid import UUID
 from app.core.dependencies import get_current_user
+from app.core.rate_limiter import limit_by_ip, limit_by_user, rate_limiter
 
 router = APIRouter(prefix="/user", tags=["User"])
 
@@ -24,7 +33,10 @@ async def get_read_user_service(db: AsyncSession = Depends(get_read_db)) -> User
 
 
 @router.post(
-    "/register", response_model=UserRegisterResponse, status_code=status.HTTP_200_OK
+    "/register",
+    response_model=UserRegisterResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_by_ip("register", settings.RATE_LIMIT_REGISTER))],
 )
 async def create_user(
     user_data: UserCreate, service: UserService = Depends(get_write_user_service)
@@ -60,22 +72,98 @@ async def get_user(
 async def search_users(
     first_name: str,
     second_name: str,
+    response: Response,
+    limit: int = 50,
+    cursor: str | None = None,
     service: UserService = Depends(get_read_user_service),
 ):
     if len(first_name) < 2 or len(second_name) < 2:
         raise AppError(strings.TO_SHORT_SEARCHING_PARAMS, status.HTTP_400_BAD_REQUEST)
 
-    logger.info(f"Searching users: first_name={first_name}, last_name={second_name}")
+    if limit < 1:
+        raise AppError(strings.NOT_VALID_ERROR_MSG, status.HTTP_400_BAD_REQUEST)
+
+    # Page size is capped server-side so response size does not depend on
+    # how common a name is
+    limit = min(limit, settings.SEARCH_MAX_PAGE_SIZE)
+
+    logger.info(
+        f"Searching users: first_name={first_name}, last_name={second_name}, limit={limit}, cursor={cursor}"
+    )
 
-    users = await service.search_users(first_name, second_name)
+    page = await service.search_users(first_name, second_name, limit, cursor)
 
-    if not users:
+    if not page.users:
         raise AppError(strings.NOT_FOUND_USER_ERROR_MSG, status.HTTP_404_NOT_FOUND)
 
-    return users
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+
+    return page.users
+
+
+def _check_text_search_params(query: str, limit: int) -> int:
+    # Trigram indexes need at least one full trigram to narrow the scan
+    if len(query.strip()) < 3:
+        raise AppError(strings.TO_SHORT_SEARCHING_QUERY, status.HTTP_400_BAD_REQUEST)
+
+    if limit < 1:
+        raise AppError(strings.NOT_VALID_ERROR_MSG, status.HTTP_400_BAD_REQUEST)
 
+    return min(limit, settings.SEARCH_MAX_PAGE_SIZE)
 
-@router.put("/friend/set/{user_id}", status_code=status.HTTP_200_OK)
+
+@router.get(
+    "/search/name", response_model=list[UserResponse], status_code=status.HTTP_200_OK
+)
+async def search_users_by_name(
+    query: str,
+    response: Response,
+    limit: int = 20,
+    cursor: str | None = None,
+    service: UserService = Depends(get_read_user_service),
+):
+    """Infix and fuzzy search on "first_name second_name", best matches first"""
+    limit = _check_text_search_params(query, limit)
+    logger.info(f"Searching users by name: query={query}, limit={limit}, cursor={cursor}")
+
+    page = await service.search_users_by_name(query, limit, cursor)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+
+    return page.users
+
+
+@router.get(
+    "/search/biography",
+    response_model=list[UserResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def search_users_by_biography(
+    query: str,
+    response: Response,
+    limit: int = 20,
+    cursor: str | None = None,
+    service: UserService = Depends(get_read_user_service),
+):
+    """Full-text search over biographies, best matches first"""
+    limit = _check_text_search_params(query, limit)
+    logger.info(
+        f"Searching users by biography: query={query}, limit={limit}, cursor={cursor}"
+    )
+
+    page = await service.search_users_by_biography(query, limit, cursor)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+
+    return page.users
+
+
+@router.put(
+    "/friend/set/{user_id}",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_by_user("friend", settings.RATE_LIMIT_FRIEND_WRITE))],
+)
 async def add_friend(
     user_id: UUID,
     service: UserService = Depends(get_write_user_service),
@@ -88,7 +176,11 @@ async def add_friend(
     return {}
 
 
-@router.put("/friend/delete/{user_id}", status_code=status.HTTP_200_OK)
+@router.put(
+    "/friend/delete/{user_id}",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_by_user("friend", settings.RATE_LIMIT_FRIEND_WRITE))],
+)
 async def delete_friend(
     user_id: UUID,
     service: UserService = Depends(get_write_user_service),
@@ -101,20 +193,112 @@ async def delete_friend(
     return {"message": "Пользователь успешно удалил из друзей пользователя"}
 
 
+@router.put(
+    "/friend/bulk",
+    response_model=FriendsBulkResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def update_friends_bulk(
+    request: FriendsBulkRequest,
+    service: UserService = Depends(get_write_user_service),
+    current_user: dict = Depends(get_current_user),
+):
+    """Add or remove many friends at once (e.g. contact import)"""
+    # Charged per friend id, a single call may write up to FRIENDS_BULK_MAX_SIZE
+    await rate_limiter.check(
+        "friend:bulk",
+        current_user["user_id"],
+        settings.RATE_LIMIT_FRIEND_BULK,
+        cost=max(len(request.user_ids), 1),
+    )
+    logger.info(
+        f"Bulk friends {request.action}: {len(request.user_ids)} user(s), current_user={current_user['user_id']}"
+    )
+    return await service.update_friends_bulk(current_user["user_id"], request)
+
+
 @router.get(
     "/friends", response_model=list[UserResponse], status_code=status.HTTP_200_OK
 )
 async def get_friends_list(
+    response: Response,
+    limit: int = 100,
+    cursor: str | None = None,
+    with_total: bool = False,
     service: UserService = Depends(get_read_user_service),
     current_user: dict = Depends(get_current_user),
 ):
-    friends = await service.get_friends_list(current_user["user_id"])
-    if not friends:
-        return []
-    return friends
+    if limit < 1:
+        raise AppError(strings.NOT_VALID_ERROR_MSG, status.HTTP_400_BAD_REQUEST)
+
+    page = await service.get_friends_list(
+        current_user["user_id"],
+        min(limit, settings.FRIENDS_MAX_PAGE_SIZE),
+        cursor,
+        with_total,
+    )
 
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
 
-@router.post("/post/create", status_code=status.HTTP_200_OK)
+    return page.users
+
+
+@router.get(
+    "/friends/mutual/{user_id}",
+    response_model=list[UserResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def get_mutual_friends(
+    user_id: UUID,
+    response: Response,
+    limit: int = 100,
+    cursor: str | None = None,
+    service: UserService = Depends(get_read_user_service),
+    current_user: dict = Depends(get_current_user),
+):
+    if limit < 1:
+        raise AppError(strings.NOT_VALID_ERROR_MSG, status.HTTP_400_BAD_REQUEST)
+
+    page = await service.get_mutual_friends(
+        current_user["user_id"],
+        user_id,
+        min(limit, settings.FRIENDS_MAX_PAGE_SIZE),
+        cursor,
+    )
+
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    response.headers["X-Total-Count"] = str(page.total)
+
+    return page.users
+
+
+@router.get(
+    "/friends/suggestions",
+    response_model=list[FriendSuggestion],
+    status_code=status.HTTP_200_OK,
+)
+async def get_friend_suggestions(
+    limit: int = 20,
+    service: UserService = Depends(get_read_user_service),
+    current_user: dict = Depends(get_current_user),
+):
+    if limit < 1:
+        raise AppError(strings.NOT_VALID_ERROR_MSG, status.HTTP_400_BAD_REQUEST)
+
+    return await service.get_friend_suggestions(
+        current_user["user_id"], min(limit, settings.FRIENDS_MAX_PAGE_SIZE)
+    )
+
+
+@router.post(
+    "/post/create",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_by_user("post", settings.RATE_LIMIT_POST_WRITE))],
+)
 async def create_post(
     post_data: PostCreate,
     service: UserService = Depends(get_write_user_service),
@@ -129,7 +313,11 @@ async def create_post(
     return str(post_id)
 
 
-@router.put("/post/update", status_code=status.HTTP_200_OK)
+@router.put(
+    "/post/update",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_by_user("post", settings.RATE_LIMIT_POST_WRITE))],
+)
 async def update_post(
     post_data: PostUpdate,
     service: UserService = Depends(get_write_user_service),
@@ -140,7 +328,11 @@ async def update_post(
     return {}
 
 
-@router.put("/post/delete/{id}", status_code=status.HTTP_200_OK)
+@router.put(
+    "/post/delete/{id}",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_by_user("post", settings.RATE_LIMIT_POST_WRITE))],
+)
 async def delete_post(
     id: UUID,
     service: UserService = Depends(get_write_user_service),
@@ -168,28 +360,54 @@ async def get_post(
     return post
 
 
+@router.get(
+    "/post/search", response_model=list[PostResponse], status_code=status.HTTP_200_OK
+)
+async def search_posts(
+    query: str,
+    response: Response,
+    limit: int = 20,
+    cursor: str | None = None,
+    service: UserService = Depends(get_read_user_service),
+):
+    """Full-text search over post texts, best matches first"""
+    limit = _check_text_search_params(query, limit)
+    logger.info(f"Searching posts: query={query}, limit={limit}, cursor={cursor}")
+
+    page = await service.search_posts(query, limit, cursor)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+
+    return page.posts
+
+
 @router.get(
     "/post/feed", response_model=list[PostResponse], status_code=status.HTTP_200_OK
 )
 async def posts(
+    response: Response,
     offset: int = 0,
     limit: int = 10,
+    cursor: str | None = None,
     service: UserService = Depends(get_read_user_service),
     current_user: dict = Depends(get_current_user),
 ):
     logger.info(
-        f"FEED posts: offset={offset}, limit={limit}, user={current_user['user_id']}"
+        f"FEED posts: offset={offset}, limit={limit}, cursor={cursor}, user={current_user['user_id']}"
     )
 
     if offset < 0 or limit < 1:
         raise AppError(strings.NOT_VALID_ERROR_MSG, status.HTTP_400_BAD_REQUEST)
 
-    posts = await service.get_posts_feed(current_user["user_id"], offset, limit)
+    feed = await service.get_posts_feed(
+        current_user["user_id"], offset, limit, cursor
+    )
 
-    if not posts:
-        return []
+    # Keyset cursor for the next page; when passed back, offset is ignored
+    if feed.next_cursor:
+        response.headers["X-Next-Cursor"] = feed.next_cursor
 
-    return posts
+    return feed.posts
 
 
 @router.post("/post/feed/rebuild", status_code=status.HTTP_200_OK)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from app.core.websocket_manager import ws_manager
-from app.core.jwt_token import get_data_from_jwt_token
+from app.core.jwt_token import verified_tokens
 from app.logger import logger
 from uuid import UUID
 from app.settings import settings
@@ -12,7 +12,7 @@ router = APIRouter(tags=["WebSocket"])
 async def websocket_post_feed(websocket: WebSocket, token: str = Query(...)):
     user_id = None
     try:
-        payload = get_data_from_jwt_token(
+        payload = verified_tokens.get_data(
             token, settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM
         )
         user_id = UUID(payload["user_id"])
@@ -0,0 +1,94 @@
+"""Circuit breaker for calls to another service."""
+
+import math
+import time
+
+from fastapi import status
+
+from app.core.exceptions import AppError
+from app.logger import logger
+from app.resources import strings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fails calls fast while the upstream is failing or slow.
+
+    After `failure_threshold` consecutive failures (errors or calls slower
+    than `slow_call_threshold`) the circuit opens and calls are rejected
+    with 503 for `open_duration` seconds. Then one probe call is let
+    through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        slow_call_threshold: float,
+        open_duration: float,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.open_duration = open_duration
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0
+        self.rejected = 0
+
+    def before_call(self):
+        """Raises 503 if the call must not be made now."""
+        if self.state == OPEN:
+            retry_after = self._opened_at + self.open_duration - time.monotonic()
+            if retry_after > 0:
+                self._reject(retry_after)
+            self.state = HALF_OPEN
+
+        if self.state == HALF_OPEN:
+            if self._probing:
+                self._reject(self.open_duration)
+            self._probing = True
+
+    def _reject(self, retry_after: float):
+        self.rejected += 1
+        raise AppError(
+            strings.SERVICE_UNAVAILABLE_ERROR_MSG,
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    def record(self, success: bool, duration: float):
+        self._probing = False
+        if success and duration <= self.slow_call_threshold:
+            if self.state != CLOSED:
+                logger.info(f"Circuit {self.name} closed")
+            self.state = CLOSED
+            self._failures = 0
+            return
+
+        self._failures += 1
+        if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(
+                    f"Circuit {self.name} opened after {self._failures} failure(s)"
+                )
+                self.opened += 1
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self):
+        """The call was abandoned without an outcome (e.g. cancelled)."""
+        self._probing = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
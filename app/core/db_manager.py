@@ -2,7 +2,8 @@
 
 import random
 import asyncio
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -125,6 +126,25 @@ class DatabaseManager:
             async with self.write_session_maker() as session:
                 yield session
 
+    @asynccontextmanager
+    async def read_session(self) -> AsyncIterator[AsyncSession]:
+        """Standalone read session for work that outlives a single request."""
+        if self.healthy_read_engines:
+            session_maker = self.read_session_makers[
+                random.choice(self.healthy_read_engines)
+            ]
+        else:
+            session_maker = self.write_session_maker
+
+        async with session_maker() as session:
+            yield session
+
+    @asynccontextmanager
+    async def write_session(self) -> AsyncIterator[AsyncSession]:
+        """Standalone master session, for reads that must not lag behind writes."""
+        async with self.write_session_maker() as session:
+            yield session
+
     async def close_all(self):
         """Close all database connections."""
         await self.stop_health_check()
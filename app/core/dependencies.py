@@ -7,7 +7,7 @@ from fastapi import Request, status
 from app.core.exceptions import AppError
 from app.resources import strings
 from app.settings import settings
-from app.core.jwt_token import get_data_from_jwt_token
+from app.core.jwt_token import verified_tokens
 
 
 async def get_write_db() -> AsyncGenerator[AsyncSession, None]:
@@ -34,7 +34,7 @@ async def get_current_user(request: Request) -> dict | None:
         raise AppError(strings.TOKEN_MISSING, status.HTTP_401_UNAUTHORIZED)
     token = token_parts[1]
 
-    payload = get_data_from_jwt_token(
+    payload = verified_tokens.get_data(
         token, settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM
     )
 
@@ -12,7 +12,9 @@ async def app_exception_handler(request: Request, exc: AppError) -> JSONResponse
     logger.error(f"AppError: {exc.description}")
 
     return JSONResponse(
-        status_code=exc.status_code, content={"description": exc.description}
+        status_code=exc.status_code,
+        content={"description": exc.description},
+        headers=exc.headers,
     )
 
 
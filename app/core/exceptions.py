@@ -4,6 +4,12 @@ from fastapi import status
 
 
 class AppError(Exception):
-    def __init__(self, name: str, status_code: int = status.HTTP_400_BAD_REQUEST):
+    def __init__(
+        self,
+        name: str,
+        status_code: int = status.HTTP_400_BAD_REQUEST,
+        headers: dict[str, str] | None = None,
+    ):
         self.description = name
         self.status_code = status_code
+        self.headers = headers
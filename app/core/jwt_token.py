@@ -1,5 +1,8 @@
 """Helper with jwt."""
 
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict
 
@@ -8,6 +11,7 @@ from fastapi import status, HTTPException, Request
 
 from app.core.exceptions import AppError
 from app.resources import strings
+from app.settings import settings
 
 
 def generate_jwt_token(
@@ -61,6 +65,53 @@ def get_data_from_jwt_token(
         raise AppError(strings.TOKEN_INVALID, status.HTTP_401_UNAUTHORIZED)
 
 
+class VerifiedTokenCache:
+    """Bounded LRU of verified token payloads, keyed by the token's SHA-256.
+
+    Entries live until the token's `exp`, so an expired token is always
+    verified again (and rejected) by `get_data_from_jwt_token`.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[float, Dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_data(self, token: str, secret_key: str, algorithm: str) -> Dict[str, Any]:
+        """Same contract as `get_data_from_jwt_token`, skipping hot tokens."""
+        key = hashlib.sha256(token.encode()).digest()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.time():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+        self.misses += 1
+        self._entries.pop(key, None)
+        payload = get_data_from_jwt_token(token, secret_key, algorithm)
+
+        expires_at = payload.get("exp")
+        if self.max_size > 0 and isinstance(expires_at, (int, float)):
+            self._entries[key] = (expires_at, payload)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return dict(payload)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+verified_tokens = VerifiedTokenCache(max_size=settings.JWT_CACHE_MAX_SIZE)
+
+
 def get_token_from_request(request: Request) -> str:
     """
     Extract JWT token from Authorization header.
@@ -0,0 +1,140 @@
+"""In-process LRU/TTL tier in front of the Redis cache."""
+
+import json
+import time
+from collections import OrderedDict
+from typing import Any
+from uuid import uuid4
+
+from app.core.redis_client import redis_client
+from app.logger import logger
+from app.settings import settings
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Returned by LocalCache.get on a miss, None is a valid cached value
+MISSING = object()
+
+
+class LocalCache:
+    """Bounded per-process cache keyed by Redis key.
+
+    A Redis key can hold several variants (e.g. different pages of one feed);
+    invalidating the key drops all of them. Instances keep each other coherent
+    by publishing invalidated keys on INVALIDATION_CHANNEL.
+    """
+
+    def __init__(self, enabled: bool, max_size: int, ttl: float):
+        self.enabled = enabled
+        self.max_size = max_size
+        self.ttl = ttl
+        self.instance_id = uuid4().hex
+        self._entries: OrderedDict[tuple[str, str], tuple[float, Any]] = OrderedDict()
+        self._variants: dict[str, set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str, variant: str = "") -> Any:
+        if not self.enabled:
+            return MISSING
+
+        entry = self._entries.get((key, variant))
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._remove((key, variant))
+            self.misses += 1
+            return MISSING
+
+        self._entries.move_to_end((key, variant))
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any, variant: str = ""):
+        if not self.enabled:
+            return
+
+        self._entries[(key, variant)] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end((key, variant))
+        self._variants.setdefault(key, set()).add(variant)
+
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, keys: list[str]):
+        for key in keys:
+            for variant in self._variants.pop(key, ()):
+                self._entries.pop((key, variant), None)
+                self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._variants.clear()
+
+    def _remove(self, entry_key: tuple[str, str]):
+        key, variant = entry_key
+        self._entries.pop(entry_key, None)
+        variants = self._variants.get(key)
+        if variants is not None:
+            variants.discard(variant)
+            if not variants:
+                del self._variants[key]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    async def publish_invalidation(self, keys: list[str]):
+        """Drop keys locally and on every other instance."""
+        if not self.enabled or not keys:
+            return
+
+        self.invalidate(keys)
+        try:
+            await redis_client.get_client().publish(
+                INVALIDATION_CHANNEL,
+                json.dumps({"origin": self.instance_id, "keys": keys}),
+            )
+        except Exception as e:
+            logger.error(f"Cache invalidation publish error: {e}")
+
+    async def listen_for_invalidations(self):
+        """Apply invalidations published by other instances, reconnecting on errors."""
+        if not self.enabled:
+            return
+
+        await redis_client.listen(
+            INVALIDATION_CHANNEL,
+            self._on_invalidation,
+            self._on_subscribe,
+            "Local cache invalidation listener",
+        )
+
+    async def _on_subscribe(self):
+        # Invalidations may have been missed while disconnected
+        self.clear()
+        logger.info("Local cache invalidation listener started")
+
+    def _on_invalidation(self, data: str):
+        data = json.loads(data)
+        if data["origin"] != self.instance_id:
+            self.invalidate(data["keys"])
+
+
+local_cache = LocalCache(
+    enabled=settings.LOCAL_CACHE_ENABLED,
+    max_size=settings.LOCAL_CACHE_MAX_SIZE,
+    ttl=settings.LOCAL_CACHE_TTL,
+)
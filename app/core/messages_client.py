@@ -1,67 +1,278 @@
+import asyncio
+import time
+from collections import deque
+
 import httpx
-from typing import List, Dict, Any
 from uuid import UUID
+from app.core.circuit_breaker import CLOSED, CircuitBreaker
 from app.settings import settings
 from app.logger import logger
 
+# Recent response times kept for the hedging delay
+LATENCY_WINDOW = 1000
+# Responses needed before the p95 is trusted
+LATENCY_MIN_SAMPLES = 20
+
+
+class LatencyTracker:
+    """p95 of the last LATENCY_WINDOW response times, re-sorted every 50 samples."""
+
+    def __init__(self):
+        self._samples: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._new_samples = 0
+        self.p95: float | None = None
+
+    def record(self, duration: float):
+        self._samples.append(duration)
+        self._new_samples += 1
+        if len(self._samples) >= LATENCY_MIN_SAMPLES and (
+            self.p95 is None or self._new_samples >= 50
+        ):
+            ordered = sorted(self._samples)
+            self.p95 = ordered[int(len(ordered) * 0.95)]
+            self._new_samples = 0
+
+
+class _InFlightStream(httpx.AsyncByteStream):
+    """Response body that holds its in-flight slot until the response is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        if self._release is not None:
+            self._release()
+            self._release = None
+        await self._stream.aclose()
+
+
+def _discard(task: asyncio.Task):
+    # Close the response of an attempt that lost the race
+    if not task.cancelled() and task.exception() is None:
+        asyncio.create_task(task.result().aclose())
+
 
 class MessagesClient:
+    """One pooled keep-alive HTTP client for all calls to messages-service.
+
+    Opened and closed in the app lifespan. requests_in_flight above
+    MESSAGES_MAX_CONNECTIONS means requests are queued for a connection
+    (a request counts until its streamed response is closed), pool_timeouts
+    counts the ones that gave up waiting.
+
+    Calls go through a circuit breaker, so a failing or slow service is
+    answered with 503 right away instead of holding requests for the
+    whole timeout. Reads can be hedged (see _hedged_request).
+    """
+
     def __init__(self):
         self.base_url = settings.MESSAGES_SERVICE_URL
-        self.timeout = httpx.Timeout(10.0, connect=5.0)
-    
-    async def send_message(
-        self, 
-        user_id: UUID, 
-        text: str, 
-        token: str, 
-        request_id: str
-    ) -> Dict[str, Any]:
-        """Send message to user via messages-service"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/v1/dialog/{user_id}/send",
-                    json={"text": text},
-                    headers={
-                        "Authorization": f"Bearer {token}",
-                        "X-Request-ID": request_id
-                    }
+        self.timeout = httpx.Timeout(
+            settings.MESSAGES_TIMEOUT, connect=5.0, pool=settings.MESSAGES_POOL_TIMEOUT
+        )
+        self.client: httpx.AsyncClient | None = None
+        self.requests = 0
+        self.requests_in_flight = 0
+        self.peak_in_flight = 0
+        self.pool_timeouts = 0
+        self.breaker = CircuitBreaker(
+            "messages-service",
+            failure_threshold=settings.MESSAGES_BREAKER_FAILURE_THRESHOLD,
+            slow_call_threshold=settings.MESSAGES_BREAKER_SLOW_CALL_THRESHOLD,
+            open_duration=settings.MESSAGES_BREAKER_OPEN_DURATION,
+        )
+        self.latencies = LatencyTracker()
+        self.hedges = 0
+        self.hedges_won = 0
+
+    async def connect(self):
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=settings.MESSAGES_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.MESSAGES_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.MESSAGES_KEEPALIVE_EXPIRY,
+            ),
+        )
+        logger.info(f"Messages client connected: {self.base_url}")
+
+    async def close(self):
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+            logger.info("Messages client closed")
+
+    def get_client(self) -> httpx.AsyncClient:
+        if not self.client:
+            raise RuntimeError("Messages client not initialized")
+        return self.client
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request and return as soon as the response headers arrive.
+
+        The body is left unread for the caller to stream; the response must
+        be closed with aclose() to return the connection to the pool.
+        Transport errors, 5xx and slow responses count against the breaker.
+        """
+        self.breaker.before_call()
+        self.requests += 1
+        self.requests_in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.requests_in_flight)
+        client = self.get_client()
+        started = time.monotonic()
+        try:
+            response = await client.send(
+                client.build_request(method, url, **kwargs), stream=True
+            )
+        except httpx.HTTPError as e:
+            if isinstance(e, httpx.PoolTimeout):
+                self.pool_timeouts += 1
+            self.breaker.record(False, time.monotonic() - started)
+            self._release_in_flight()
+            raise
+        except BaseException:
+            self.breaker.release()
+            self._release_in_flight()
+            raise
+
+        # The body still holds the connection, release the slot on aclose()
+        response.stream = _InFlightStream(response.stream, self._release_in_flight)
+        duration = time.monotonic() - started
+        self.breaker.record(response.status_code < 500, duration)
+        self.latencies.record(duration)
+        return response
+
+    def _release_in_flight(self):
+        self.requests_in_flight -= 1
+
+    async def _hedged_request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """_request for idempotent calls, with a second attempt if the first is slow.
+
+        If no response came within the p95 latency (at least
+        MESSAGES_HEDGE_MIN_DELAY) the request is sent again and the first
+        response wins; the other attempt is cancelled or its response closed.
+        """
+        delay = self.latencies.p95
+        if (
+            not settings.MESSAGES_HEDGE_ENABLED
+            or delay is None
+            or self.breaker.state != CLOSED
+        ):
+            return await self._request(method, url, **kwargs)
+
+        first = asyncio.create_task(self._request(method, url, **kwargs))
+        attempts = [first]
+        winner = None
+        try:
+            done, _ = await asyncio.wait(
+                attempts, timeout=max(delay, settings.MESSAGES_HEDGE_MIN_DELAY)
+            )
+            if not done:
+                self.hedges += 1
+                attempts.append(
+                    asyncio.create_task(self._request(method, url, **kwargs))
                 )
-                response.raise_for_status()
-                logger.info(
-                    f"request_id={request_id} | Message sent to {user_id} via messages-service"
+
+            pending = set(attempts)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
                 )
-                return response.json()
-            except httpx.HTTPError as e:
-                logger.error(
-                    f"request_id={request_id} | Failed to send message: {e}"
+                winner = next(
+                    (t for t in done if not t.cancelled() and t.exception() is None),
+                    None,
                 )
-                raise
-    
+        finally:
+            for task in attempts:
+                if task is not winner:
+                    task.cancel()
+                    task.add_done_callback(_discard)
+
+        if winner is None:
+            # Every attempt failed, report the first one's error
+            return first.result()
+        if winner is not first:
+            self.hedges_won += 1
+        return winner.result()
+
+    def stats(self) -> dict:
+        return {
+            "max_connections": settings.MESSAGES_MAX_CONNECTIONS,
+            "requests": self.requests,
+            "requests_in_flight": self.requests_in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "pool_timeouts": self.pool_timeouts,
+            "circuit_breaker": self.breaker.stats(),
+            "latency_p95": self.latencies.p95,
+            "hedges": self.hedges,
+            "hedges_won": self.hedges_won,
+        }
+
+    async def send_message(
+        self,
+        user_id: UUID,
+        text: str,
+        token: str,
+        request_id: str,
+        accept_encoding: str = "identity",
+    ) -> httpx.Response:
+        """Send message to user via messages-service, response body not read"""
+        try:
+            response = await self._request(
+                "POST",
+                f"/api/v1/dialog/{user_id}/send",
+                json={"text": text},
+                headers=_headers(token, request_id, accept_encoding),
+            )
+            logger.info(
+                f"request_id={request_id} | Message to {user_id} sent to messages-service: {response.status_code}"
+            )
+            return response
+        except httpx.HTTPError as e:
+            logger.error(
+                f"request_id={request_id} | Failed to send message: {e}"
+            )
+            raise
+
     async def get_messages(
-        self, 
-        user_id: UUID, 
-        token: str, 
-        request_id: str
-    ) -> List[Dict[str, Any]]:
-        """Get conversation with user via messages-service"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/api/v1/dialog/{user_id}/list",
-                    headers={
-                        "Authorization": f"Bearer {token}",
-                        "X-Request-ID": request_id
-                    }
-                )
-                response.raise_for_status()
-                logger.info(
-                    f"request_id={request_id} | Retrieved messages from {user_id} via messages-service"
-                )
-                return response.json()
-            except httpx.HTTPError as e:
-                logger.error(
-                    f"request_id={request_id} | Failed to get messages: {e}"
-                )
-                raise
+        self,
+        user_id: UUID,
+        token: str,
+        request_id: str,
+        accept_encoding: str = "identity",
+    ) -> httpx.Response:
+        """Get conversation with user via messages-service, response body not read"""
+        try:
+            response = await self._hedged_request(
+                "GET",
+                f"/api/v1/dialog/{user_id}/list",
+                headers=_headers(token, request_id, accept_encoding),
+            )
+            logger.info(
+                f"request_id={request_id} | Messages with {user_id} requested from messages-service: {response.status_code}"
+            )
+            return response
+        except httpx.HTTPError as e:
+            logger.error(
+                f"request_id={request_id} | Failed to get messages: {e}"
+            )
+            raise
+
+
+def _headers(token: str, request_id: str, accept_encoding: str) -> dict[str, str]:
+    return {
+        "Authorization": f"Bearer {token}",
+        "X-Request-ID": request_id,
+        # The body is passed through as is, so it may only be encoded
+        # in a way our own client accepts
+        "Accept-Encoding": accept_encoding,
+    }
+
+
+messages_client = MessagesClient()
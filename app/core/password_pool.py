@@ -0,0 +1,93 @@
+"""Bounded process pool for bcrypt, keeping it off the event loop."""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, TypeVar
+
+from fastapi import status
+
+from app.core import security
+from app.core.exceptions import AppError
+from app.logger import logger
+from app.resources import strings
+from app.settings import settings
+
+T = TypeVar("T")
+
+
+class PasswordPool:
+    """Runs password hashing and verification in worker processes.
+
+    At most `max_pending` operations may be queued or running; beyond that
+    callers are rejected immediately with 503 instead of piling up.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self.dummy_hash: str | None = None
+        self._executor: ProcessPoolExecutor | None = None
+
+    def start(self):
+        # spawn: workers must not inherit the event loop or open connections
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        # Verified against on unknown ids so both paths cost one bcrypt check
+        self.dummy_hash = security.hash_password("dummy_password")
+        logger.info(f"Password pool started with {self.workers} worker(s)")
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise AppError(
+                strings.SERVICE_UNAVAILABLE_ERROR_MSG,
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "1"},
+            )
+
+        self.pending += 1
+        try:
+            # Without a started pool (scripts) bcrypt still leaves the loop,
+            # on the default thread pool
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, fn, *args
+            )
+        finally:
+            self.pending -= 1
+
+    async def hash_password(self, password: str) -> str:
+        return await self._run(security.hash_password, password)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(security.verify_password, plain_password, hashed_password)
+
+    async def verify_dummy(self, plain_password: str) -> bool:
+        """Burn one verification for an unknown user (prevents timing attacks)."""
+        if self.dummy_hash is None:
+            self.dummy_hash = security.hash_password("dummy_password")
+        await self.verify_password(plain_password, self.dummy_hash)
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_POOL_WORKERS,
+    max_pending=settings.PASSWORD_POOL_MAX_PENDING,
+)
@@ -0,0 +1,117 @@
+"""Rate limiting shared by all instances through Redis (GCRA)."""
+
+import math
+
+from fastapi import Depends, Request, status
+
+from app.core.dependencies import get_current_user
+from app.core.exceptions import AppError
+from app.core.redis_client import redis_client
+from app.logger import logger
+from app.resources import strings
+from app.settings import settings
+
+KEY_PREFIX = "ratelimit:"
+
+# Generic cell rate algorithm: one key per (limit, client) holding the
+# theoretical arrival time (TAT) of the next request in microseconds.
+# Time comes from the Redis server, so web instances need no synced clocks.
+# ARGV[1] - emission interval (period / count), ARGV[2] - burst tolerance,
+# ARGV[3] - cost of the request in units of the limit.
+# Returns 0 if the request is allowed, otherwise microseconds to wait.
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval * tonumber(ARGV[3])
+local allow_at = new_tat - tolerance
+if now < allow_at then
+    return allow_at - now
+end
+
+redis.call('SET', KEYS[1], string.format('%d', new_tat), 'PX', math.ceil((new_tat - now) / 1000))
+return 0
+"""
+
+
+def parse_limit(limit: str) -> tuple[int, int]:
+    """"10/60" -> (10 requests, per 60 seconds)."""
+    count, period = limit.split("/")
+    return int(count), int(period)
+
+
+class RateLimiter:
+    """Requests allowed per key: `count` per `period` seconds, spread evenly.
+
+    Up to `count` requests can be made at once, after that one more every
+    period / count seconds. Errors talking to Redis let requests through.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+
+    async def check(self, name: str, key: str, limit: str, cost: int = 1):
+        """Count a request of `key` against limit `name`; raises 429 over the limit.
+
+        `cost` is how many units of the limit the request uses. A request
+        costing more than the limit's count could never pass, it is rejected
+        with 400 instead of a 429 whose Retry-After would not help.
+        """
+        if not self.enabled:
+            return
+
+        count, period = parse_limit(limit)
+        if cost > count:
+            raise AppError(strings.NOT_VALID_ERROR_MSG, status.HTTP_400_BAD_REQUEST)
+
+        interval = period * 1_000_000 // count
+        tolerance = interval * count
+        try:
+            wait = await redis_client.script(GCRA_SCRIPT)(
+                keys=[f"{KEY_PREFIX}{name}:{key}"], args=[interval, tolerance, cost]
+            )
+        except Exception as e:
+            logger.error(f"Rate limiter error: {e}")
+            return
+
+        if wait:
+            raise AppError(
+                strings.TOO_MANY_REQUESTS_ERROR_MSG,
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(math.ceil(int(wait) / 1_000_000))},
+            )
+
+
+rate_limiter = RateLimiter(enabled=settings.RATE_LIMIT_ENABLED)
+
+
+def get_client_ip(request: Request) -> str:
+    # nginx passes the client address in X-Real-IP
+    return request.headers.get("x-real-ip") or (
+        request.client.host if request.client else "unknown"
+    )
+
+
+def limit_by_ip(name: str, limit: str):
+    """Dependency limiting requests of a route per client IP."""
+
+    async def dependency(request: Request):
+        await rate_limiter.check(name, get_client_ip(request), limit)
+
+    return dependency
+
+
+def limit_by_user(name: str, limit: str):
+    """Dependency limiting requests of a route per authenticated user."""
+
+    async def dependency(current_user: dict = Depends(get_current_user)):
+        await rate_limiter.check(name, current_user["user_id"], limit)
+
+    return dependency
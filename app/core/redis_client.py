@@ -1,4 +1,8 @@
+import asyncio
+from typing import Awaitable, Callable
+
 import redis.asyncio as redis
+from redis.commands.core import AsyncScript
 from app.settings import settings
 from app.logger import logger
 
@@ -6,6 +10,7 @@ from app.logger import logger
 class RedisClient:
     def __init__(self):
         self.client: redis.Redis | None = None
+        self._scripts: dict[str, AsyncScript] = {}
 
     async def connect(self):
         self.client = redis.Redis(
@@ -20,6 +25,7 @@ class RedisClient:
     async def close(self):
         if self.client:
             await self.client.close()
+            self._scripts.clear()
             logger.info("Redis connection closed")
 
     def get_client(self) -> redis.Redis:
@@ -27,5 +33,43 @@ class RedisClient:
             raise RuntimeError("Redis client not initialized")
         return self.client
 
+    def script(self, source: str) -> AsyncScript:
+        """Lua script bound to the client, executed by EVALSHA after first load."""
+        if source not in self._scripts:
+            self._scripts[source] = self.get_client().register_script(source)
+        return self._scripts[source]
+
+    async def listen(
+        self,
+        channel: str,
+        on_message: Callable[[str], None],
+        on_subscribe: Callable[[], Awaitable[None]],
+        name: str,
+    ):
+        """Handle messages of a channel forever, resubscribing after errors.
+
+        on_subscribe runs after every (re)subscription, when new messages are
+        already queued on the connection, to resync state that may have
+        missed some while disconnected.
+        """
+        while True:
+            try:
+                pubsub = self.get_client().pubsub()
+                try:
+                    await pubsub.subscribe(channel)
+                    await on_subscribe()
+
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            on_message(message["data"])
+                finally:
+                    # Return the connection before the next attempt opens one
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{name} error: {e}")
+                await asyncio.sleep(1)
+
 
 redis_client = RedisClient()
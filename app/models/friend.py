@@ -1,4 +1,4 @@
-from sqlalchemy import DateTime, Boolean, text as sa_text, ForeignKey
+from sqlalchemy import DateTime, Boolean, text as sa_text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
@@ -24,3 +24,13 @@ class Friend(Base):
     updated_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True), onupdate=func.now()
     )
+
+    __table_args__ = (
+        # Covers friend id lookups of active friendships (index-only scans)
+        Index(
+            "ix_friends_active",
+            user_id,
+            friend_id,
+            postgresql_where=sa_text("is_active = true"),
+        ),
+    )
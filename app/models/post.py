@@ -1,4 +1,4 @@
-from sqlalchemy import DateTime, Boolean, text as sa_text, ForeignKey
+from sqlalchemy import DateTime, Boolean, text as sa_text, ForeignKey, Index, literal_column
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
@@ -26,3 +26,18 @@ class Post(Base):
     updated_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True), onupdate=func.now()
     )
+
+    __table_args__ = (
+        Index(
+            "ix_posts_author_created_at_id",
+            author_user_id,
+            created_at.desc(),
+            id.desc(),
+            postgresql_where=sa_text("is_active = true"),
+        ),
+        Index(
+            "ix_posts_text_fts",
+            func.to_tsvector(literal_column("'russian'"), text),
+            postgresql_using="gin",
+        ),
+    )
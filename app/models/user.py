@@ -1,4 +1,4 @@
-from sqlalchemy import String, DateTime, Boolean, text as sa_text, Index
+from sqlalchemy import String, DateTime, Boolean, text as sa_text, Index, literal_column
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
@@ -32,10 +32,24 @@ class User(Base):
     )
 
     __table_args__ = (
+        # Serves the prefix search and its keyset ORDER BY: LIKE 'prefix%'
+        # ranges can use a "C" collation btree without pattern ops
         Index(
-            'idx_users_search_lower',
-            func.lower(first_name),
-            func.lower(second_name),
-            postgresql_ops={'lower(first_name::text)': 'varchar_pattern_ops', 'lower(second_name::text)': 'varchar_pattern_ops'}
+            'ix_users_search_keyset',
+            func.lower(first_name).collate('C'),
+            func.lower(second_name).collate('C'),
+            id,
+        ),
+        # Infix and fuzzy name search (pg_trgm)
+        Index(
+            'ix_users_full_name_trgm',
+            (first_name + literal_column("' '") + second_name).label('full_name'),
+            postgresql_using='gin',
+            postgresql_ops={'full_name': 'gin_trgm_ops'},
+        ),
+        Index(
+            'ix_users_biography_fts',
+            func.to_tsvector(literal_column("'russian'"), biography),
+            postgresql_using='gin',
         ),
     )
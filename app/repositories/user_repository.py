@@ -2,10 +2,33 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
 from app.models.user import User
 from app.schemas.user import UserCreate
-from typing import List
+from typing import AsyncIterator, List
+from datetime import datetime
 from uuid import uuid4, UUID
 from app.schemas.post import PostCreate, PostUpdate
 
+# Text search configuration of the full-text indexes (see models)
+FULL_TEXT_CONFIG = "russian"
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _ranked_page_query(matches: str, after: tuple[float, UUID] | None):
+    """Keyset page over `matches` (a query with a `rank` column), best first."""
+    keyset = (
+        "WHERE (rank, id) < (:after_rank, :after_id)" if after is not None else ""
+    )
+    return text(
+        f"""
+        SELECT * FROM ({matches}) matches
+        {keyset}
+        ORDER BY rank DESC, id DESC
+        LIMIT :limit
+        """
+    )
+
 
 class UserRepository:
     def __init__(self, db: AsyncSession):
@@ -64,24 +87,117 @@ class UserRepository:
         return dict(row) if row else None
 
     async def search_users_with_raw_sql(
-        self, first_name: str, second_name: str
+        self,
+        first_name: str,
+        second_name: str,
+        limit: int,
+        after: tuple[str, str, UUID] | None = None,
     ) -> List[dict] | None:
+        """Keyset page of users whose names start with the given prefixes.
+
+        Ordered by (lower(first_name), lower(second_name), id) in the "C"
+        collation, which ix_users_search_keyset serves directly; `after` is the
+        sort key of the last user of the previous page.
+        """
+        keyset = (
+            """
+              and (lower(first_name) COLLATE "C", lower(second_name) COLLATE "C", id)
+                > (:after_first_name, :after_second_name, :after_id)
+            """
+            if after is not None
+            else ""
+        )
+        query = text(
+            f"""
+            SELECT id, first_name, second_name, birthdate::date as birthdate, biography, city,
+                   lower(first_name) as first_name_key, lower(second_name) as second_name_key
+            FROM users
+            WHERE lower(first_name) COLLATE "C" LIKE lower(:first_name) || '%'
+              and lower(second_name) COLLATE "C" LIKE lower(:second_name) || '%'
+              {keyset}
+            order by lower(first_name) COLLATE "C", lower(second_name) COLLATE "C", id
+            LIMIT :limit
+            """
+        )
+
+        params = {"first_name": first_name, "second_name": second_name, "limit": limit}
+        if after is not None:
+            params["after_first_name"], params["after_second_name"], params["after_id"] = after
+
+        result = await self.db.execute(query, params)
+
+        rows = result.mappings().fetchall()
+        return [dict(row) for row in rows] if rows else None
+
+    async def get_users_by_ids(self, user_ids: List[UUID]) -> List[dict] | None:
         query = text(
             """
             SELECT id, first_name, second_name, birthdate::date as birthdate, biography, city
-            FROM users
-            WHERE lower(first_name) LIKE lower(:first_name) || '%' and lower(second_name) LIKE lower(:second_name) || '%'
-            order by id
+            FROM users WHERE id = ANY(:user_ids)
             """
         )
+        result = await self.db.execute(query, {"user_ids": user_ids})
+        rows = result.mappings().fetchall()
+        return [dict(row) for row in rows] if rows else None
 
-        result = await self.db.execute(
-            query, {"first_name": first_name, "second_name": second_name}
+    async def iter_search_keys(
+        self, batch_size: int
+    ) -> AsyncIterator[List[tuple[str, str, UUID]]]:
+        """Stream (lower(first_name), lower(second_name), id) of all users in batches."""
+        query = text(
+            """
+            SELECT lower(first_name), lower(second_name), id
+            FROM users
+            """
         )
+        result = await self.db.stream(
+            query, execution_options={"yield_per": batch_size}
+        )
+        async for partition in result.partitions(batch_size):
+            yield [tuple(row) for row in partition]
+
+    async def _fetch_ranked_page(
+        self,
+        matches: str,
+        params: dict,
+        limit: int,
+        after: tuple[float, UUID] | None,
+    ) -> List[dict] | None:
+        params = {**params, "limit": limit}
+        if after is not None:
+            params["after_rank"], params["after_id"] = after
 
+        result = await self.db.execute(_ranked_page_query(matches, after), params)
         rows = result.mappings().fetchall()
         return [dict(row) for row in rows] if rows else None
 
+    async def search_users_by_name(
+        self, query: str, limit: int, after: tuple[float, UUID] | None = None
+    ) -> List[dict] | None:
+        """Infix and fuzzy (trigram) match on the full name, ranked by similarity."""
+        matches = """
+            SELECT id, first_name, second_name, birthdate::date as birthdate, biography, city,
+                   word_similarity(:query, first_name || ' ' || second_name) AS rank
+            FROM users
+            WHERE :query <% (first_name || ' ' || second_name)
+               OR (first_name || ' ' || second_name) ILIKE '%' || :pattern || '%'
+        """
+        return await self._fetch_ranked_page(
+            matches, {"query": query, "pattern": _escape_like(query)}, limit, after
+        )
+
+    async def search_users_by_biography(
+        self, query: str, limit: int, after: tuple[float, UUID] | None = None
+    ) -> List[dict] | None:
+        """Full-text match on the biography, ranked by ts_rank_cd."""
+        matches = f"""
+            SELECT id, first_name, second_name, birthdate::date as birthdate, biography, city,
+                   ts_rank_cd(to_tsvector('{FULL_TEXT_CONFIG}', biography), q) AS rank
+            FROM users, websearch_to_tsquery('{FULL_TEXT_CONFIG}', :query) q
+            WHERE to_tsvector('{FULL_TEXT_CONFIG}', biography) @@ q
+        """
+        return await self._fetch_ranked_page(matches, {"query": query}, limit, after)
+
     async def get_friendship_raw_sql(
         self, current_user_id: UUID, friend_id: UUID
     ) -> dict | None:
@@ -139,29 +255,126 @@ class UserRepository:
 
         await self.db.commit()
 
-    async def get_friends_list(self, user_id: UUID) -> List[dict] | None:
+    async def get_existing_user_ids(self, user_ids: List[UUID]) -> List[UUID]:
         query = text(
             """
+            SELECT id FROM users WHERE id = ANY(:user_ids)
+            """
+        )
+        result = await self.db.execute(query, {"user_ids": user_ids})
+        return [row[0] for row in result.fetchall()]
+
+    async def add_friends(self, current_user_id: UUID, friend_ids: List[UUID]):
+        """Upsert both directions of every friendship in one statement.
+
+        `friend_ids` must not contain duplicates (ON CONFLICT cannot touch a
+        row twice).
+        """
+        query = text(
+            """
+            INSERT INTO friends (user_id, friend_id, is_active, created_at)
+            SELECT pairs.user_id, pairs.friend_id, true, NOW()
+            FROM (
+                SELECT CAST(:user_id AS uuid) AS user_id, unnest(CAST(:friend_ids AS uuid[])) AS friend_id
+                UNION ALL
+                SELECT unnest(CAST(:friend_ids AS uuid[])), CAST(:user_id AS uuid)
+            ) pairs
+            ON CONFLICT (user_id, friend_id)
+            DO UPDATE SET is_active = true, updated_at = NOW()
+            """
+        )
+
+        await self.db.execute(
+            query,
+            {
+                "user_id": current_user_id,
+                "friend_ids": friend_ids,
+            },
+        )
+
+        await self.db.commit()
+
+    async def delete_friends(self, current_user_id: UUID, friend_ids: List[UUID]):
+        query = text(
+            """
+            UPDATE friends 
+            SET is_active = false, updated_at = NOW()
+            WHERE (user_id = :user_id AND friend_id = ANY(:friend_ids))
+               OR (friend_id = :user_id AND user_id = ANY(:friend_ids))
+            """
+        )
+
+        await self.db.execute(
+            query,
+            {
+                "user_id": current_user_id,
+                "friend_ids": friend_ids,
+            },
+        )
+
+        await self.db.commit()
+
+    async def get_friends_list(
+        self,
+        user_id: UUID,
+        limit: int,
+        after: tuple[str, str, UUID] | None = None,
+    ) -> List[dict] | None:
+        """Keyset page of friends ordered by (first_name, second_name, id).
+
+        Friend ids come from an index-only scan of ix_friends_active; with
+        LIMIT the sort is a bounded top-N over the friends after `after`.
+        """
+        keyset = (
+            "AND (u.first_name, u.second_name, u.id) > (:after_first_name, :after_second_name, :after_id)"
+            if after is not None
+            else ""
+        )
+        query = text(
+            f"""
             SELECT u.id, u.first_name, u.second_name, u.birthdate::date as birthdate, u.biography, u.city
             FROM friends f
             JOIN users u ON f.friend_id = u.id
             WHERE f.user_id = :user_id AND f.is_active = true
-            ORDER BY u.first_name, u.second_name
+            {keyset}
+            ORDER BY u.first_name, u.second_name, u.id
+            LIMIT :limit
             """
         )
 
-        result = await self.db.execute(query, {"user_id": user_id})
+        params = {"user_id": user_id, "limit": limit}
+        if after is not None:
+            params["after_first_name"], params["after_second_name"], params["after_id"] = after
+
+        result = await self.db.execute(query, params)
         rows = result.mappings().fetchall()
         return [dict(row) for row in rows] if rows else None
 
-    async def create_post(self, posts: PostCreate, user_id: UUID) -> UUID | None:
+    async def iter_friendships(
+        self, batch_size: int
+    ) -> AsyncIterator[List[tuple[UUID, UUID]]]:
+        """Stream (user_id, friend_id) of all active friendships in batches."""
+        query = text(
+            """
+            SELECT user_id, friend_id
+            FROM friends
+            WHERE is_active = true
+            """
+        )
+        result = await self.db.stream(
+            query, execution_options={"yield_per": batch_size}
+        )
+        async for partition in result.partitions(batch_size):
+            yield [tuple(row) for row in partition]
+
+    async def create_post(self, posts: PostCreate, user_id: UUID) -> dict:
         post_id = uuid4()
 
         query = text(
             """
             INSERT INTO posts (id, text, author_user_id)
             VALUES (:post_id, :text, :user_id)
-            RETURNING id
+            RETURNING id, text, author_user_id, created_at
             """
         )
 
@@ -174,13 +387,14 @@ class UserRepository:
             },
         )
 
+        row = result.mappings().one()
         await self.db.commit()
-        return result.scalar_one()
+        return dict(row)
 
     async def get_post_by_id(self, post_id: UUID) -> dict | None:
         query = text(
             """
-            SELECT id, text, author_user_id
+            SELECT id, text, author_user_id, created_at
             FROM posts WHERE id = :post_id and is_active = true
             """
         )
@@ -188,16 +402,30 @@ class UserRepository:
         row = result.mappings().fetchone()
         return dict(row) if row else None
 
-    async def update_post(self, post_data: PostUpdate):
+    async def get_posts_by_ids(self, post_ids: List[UUID]) -> List[dict] | None:
+        query = text(
+            """
+            SELECT id, text, author_user_id, created_at
+            FROM posts WHERE id = ANY(:post_ids) and is_active = true
+            """
+        )
+        result = await self.db.execute(query, {"post_ids": post_ids})
+        rows = result.mappings().fetchall()
+        return [dict(row) for row in rows] if rows else None
+
+    async def update_post(self, post_data: PostUpdate) -> dict | None:
+        # clock_timestamp() is taken after the row lock, so updated_at orders
+        # concurrent edits and doubles as the post cache version
         query = text(
             """
             UPDATE posts 
-            SET text = :text, updated_at = NOW()
-            WHERE id = :post_id
+            SET text = :text, updated_at = clock_timestamp()
+            WHERE id = :post_id AND is_active = true
+            RETURNING id, text, author_user_id, created_at, updated_at
             """
         )
 
-        await self.db.execute(
+        result = await self.db.execute(
             query,
             {
                 "post_id": post_data.id,
@@ -205,36 +433,53 @@ class UserRepository:
             },
         )
 
+        row = result.mappings().fetchone()
         await self.db.commit()
+        return dict(row) if row else None
 
-    async def delete_post(self, post_id: UUID):
+    async def delete_post(self, post_id: UUID) -> datetime | None:
         query = text(
             """
             UPDATE posts 
-            SET is_active = false, updated_at = NOW()
+            SET is_active = false, updated_at = clock_timestamp()
             WHERE id = :post_id
+            RETURNING updated_at
             """
         )
 
-        await self.db.execute(
+        result = await self.db.execute(
             query,
             {
                 "post_id": post_id,
             },
         )
 
+        updated_at = result.scalar_one_or_none()
         await self.db.commit()
+        return updated_at
+
+    async def search_posts(
+        self, query: str, limit: int, after: tuple[float, UUID] | None = None
+    ) -> List[dict] | None:
+        """Full-text match on active posts, ranked by ts_rank_cd."""
+        matches = f"""
+            SELECT id, text, author_user_id, created_at,
+                   ts_rank_cd(to_tsvector('{FULL_TEXT_CONFIG}', text), q) AS rank
+            FROM posts, websearch_to_tsquery('{FULL_TEXT_CONFIG}', :query) q
+            WHERE to_tsvector('{FULL_TEXT_CONFIG}', text) @@ q AND is_active = true
+        """
+        return await self._fetch_ranked_page(matches, {"query": query}, limit, after)
 
     async def get_posts_feed(
         self, user_id: UUID, offset: int, limit: int
     ) -> List[dict] | None:
         query = text(
             """
-            SELECT p.id, p.text, p.author_user_id
+            SELECT p.id, p.text, p.author_user_id, p.created_at
             FROM friends f
             JOIN posts p ON f.friend_id = p.author_user_id AND p.is_active = true
             WHERE f.user_id = :user_id AND f.is_active = true
-            ORDER BY p.updated_at, p.created_at DESC
+            ORDER BY p.created_at DESC, p.id DESC
             OFFSET :offset
             LIMIT :limit
             """
@@ -247,6 +492,35 @@ class UserRepository:
         rows = result.mappings().fetchall()
         return [dict(row) for row in rows] if rows else None
 
+    async def get_posts_feed_after(
+        self, user_id: UUID, created_at: datetime, post_id: UUID, limit: int
+    ) -> List[dict] | None:
+        """Keyset page of the feed: posts strictly older than (created_at, id)."""
+        query = text(
+            """
+            SELECT p.id, p.text, p.author_user_id, p.created_at
+            FROM friends f
+            JOIN posts p ON f.friend_id = p.author_user_id AND p.is_active = true
+            WHERE f.user_id = :user_id AND f.is_active = true
+              AND (p.created_at, p.id) < (:created_at, :post_id)
+            ORDER BY p.created_at DESC, p.id DESC
+            LIMIT :limit
+            """
+        )
+
+        result = await self.db.execute(
+            query,
+            {
+                "user_id": user_id,
+                "created_at": created_at,
+                "post_id": post_id,
+                "limit": limit,
+            },
+        )
+
+        rows = result.mappings().fetchall()
+        return [dict(row) for row in rows] if rows else None
+
     async def get_friend_ids(self, user_id: UUID) -> List[UUID] | None:
         query = text(
             """
@@ -8,6 +8,7 @@ PASS_OR_LOGIN_ERROR_MSG = "Пользователь не найден"
 
 NOT_FOUND_USER_ERROR_MSG = "Анкета не найдена"
 TO_SHORT_SEARCHING_PARAMS = "Параметры поиска должны быть длиной не менее 2 символов."
+TO_SHORT_SEARCHING_QUERY = "Поисковый запрос должен быть длиной не менее 3 символов."
 TOKEN_MISSING = "Отсутствует или неправильный authorization header"
 
 FRIEND_ADDED_MSG = "Пользователь успешно указал своего друга"
@@ -15,5 +16,8 @@ FRIEND_AND_USER_THE_SAME_ERROR_MSG = "Невозможно добавить се
 ALREADY_FRIEND_ERROR_MSG = "Пользователь уже является другом"
 NOT_FOUND_FRIEND_ERROR_MSG = "Друг не найден"
 
+SERVICE_UNAVAILABLE_ERROR_MSG = "Сервис временно недоступен, повторите запрос позже"
+TOO_MANY_REQUESTS_ERROR_MSG = "Слишком много запросов, повторите запрос позже"
+
 NOT_FOUND_POST_ERROR_MSG = "Пост не найден"
 NOT_OWNER_POST_ERROR_MSG = "Пользователь не является владельцем поста"
@@ -18,3 +18,8 @@ class PostResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class FeedPage(BaseModel):
+    posts: list[PostResponse]
+    next_cursor: str | None = None
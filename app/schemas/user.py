@@ -1,7 +1,9 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
+from typing import Literal
 from datetime import date, datetime
 from uuid import UUID
 from app.models.enums import Gender
+from app.settings import settings
 
 
 class UserCreate(BaseModel):
@@ -35,3 +37,23 @@ class UserResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class FriendSuggestion(UserResponse):
+    mutual_friends: int
+
+
+class UserPage(BaseModel):
+    users: list[UserResponse]
+    next_cursor: str | None = None
+    total: int | None = None
+
+
+class FriendsBulkRequest(BaseModel):
+    action: Literal["add", "remove"]
+    user_ids: list[UUID] = Field(max_length=settings.FRIENDS_BULK_MAX_SIZE)
+
+
+class FriendsBulkResponse(BaseModel):
+    updated: list[UUID]
+    not_found: list[UUID]
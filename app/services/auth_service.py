@@ -1,10 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.user_repository import UserRepository
 from app.schemas.auth import LoginResponse, UserLogin
-from app.core.security import verify_password
+from app.core.password_pool import password_pool
 from app.core.jwt_token import generate_jwt_token
 from app.settings import settings
-from app.core.security import hash_password
 
 
 class AuthService:
@@ -14,14 +13,12 @@ class AuthService:
     async def login(self, credentials: UserLogin) -> LoginResponse | None:
         user = await self.user_repository.get_by_id_for_auth(credentials.id)
 
-        password_valid = verify_password(
-            credentials.password,
-            (
-                user["password"]
-                if user
-                else hash_password("dummy_password")  # for(prevents timing attacks)
-            ),
-        )
+        if user:
+            password_valid = await password_pool.verify_password(
+                credentials.password, user["password"]
+            )
+        else:
+            password_valid = await password_pool.verify_dummy(credentials.password)
 
         if not user or not password_valid:
             return None
@@ -1,71 +1,868 @@
 import json
-from uuid import UUID
+from datetime import datetime
+from typing import NamedTuple
+from uuid import UUID, uuid4
 from app.core.redis_client import redis_client
+from app.core.local_cache import MISSING, local_cache
 from app.settings import settings
 from app.logger import logger
+from app.utils.cursor import encode_cursor, from_micros, to_micros
+
+
+class CachedFeed(NamedTuple):
+    entries: list[str]
+    ttl: float
+    rebuild_cost: float
 
 
 class CacheService:
+    """Redis cache for feeds, posts, friend sets, user profiles and searches.
+
+    Feed and timeline lists hold only feed entries ("<created_at micros>:<post id>",
+    newest first, fixed width so they compare as strings in (created_at, id)
+    order). Post bodies live once in the shared post:{id} cache.
+
+    Post writes are versioned (post:version:{id}, the row's updated_at) and
+    only replace older versions; fills from DB reads never replace an
+    existing entry, so a slow reader cannot resurrect an edited or deleted
+    post. Deleted and unknown posts are cached as a tombstone.
+
+    Feed pages and post bodies are also kept in the optional in-process
+    local_cache tier; every write here publishes the touched keys so other
+    instances drop their local copies.
+
+    Feeds are invalidated per author with a generation counter: bumping an
+    author records (author, generation) in feed:author_gens in O(1), and each
+    feed is checked against the authors it was built from on its next read.
+    """
+
     FEED_KEY_PREFIX = "feed:"
+    TIMELINE_KEY_PREFIX = "timeline:"
+    POST_KEY_PREFIX = "post:"
+    POST_VERSION_KEY_PREFIX = "post:version:"
+    HIGH_DEGREE_AUTHORS_KEY = "feed:high_degree_authors"
+    FEED_COST_KEY_PREFIX = "feed:cost:"
+    FEED_GEN_KEY_PREFIX = "feed:gen:"
+    FEED_AUTHORS_KEY_PREFIX = "feed:authors:"
+    FEED_CLOCK_KEY = "feed:clock"
+    AUTHOR_GENS_KEY = "feed:author_gens"
+    FRIENDS_KEY_PREFIX = "friends:"
+    USER_KEY_PREFIX = "user:"
+    SEARCH_KEY_PREFIX = "search:"
+    LOCK_KEY_PREFIX = "lock:"
+    POST_TOMBSTONE = "deleted"
+    # Negative cache entry for user ids that do not exist
+    USER_NOT_FOUND = "none"
+    # Member present in every loaded friend set, so an empty friend list can
+    # be cached and a set created by write-through alone reads as a miss
+    FRIENDS_LOADED_MARKER = "-"
+    # Last entry of a cached feed that holds the user's whole feed (fewer
+    # than FEED_CACHE_SIZE posts); sorts below every real entry, so posts
+    # pushed later stay in front of it until LTRIM cuts it off a full list
+    FEED_COMPLETE_MARKER = "-"
+
+    # Generation check, bounds checks and page read in one round trip, see
+    # get_feed_from_cache. ARGV[3] is an optional keyset position: the page
+    # starts after it. ARGV[4] is the size of the author generation log,
+    # ARGV[5] the complete-feed marker, which is not counted or returned.
+    # Without it the list is only the head of the feed: entries dropped by
+    # LREM do not make it complete, so pages past its end go to the DB.
+    FEED_PAGE_SCRIPT = """
+    local size = redis.call("LLEN", KEYS[1])
+    local offset = tonumber(ARGV[1])
+    local limit = tonumber(ARGV[2])
+    local after = ARGV[3]
+
+    if size == 0 then
+        return false
+    end
+    local complete = redis.call("LINDEX", KEYS[1], -1) == ARGV[5]
+    if complete then
+        size = size - 1
+    end
+
+    -- Lazily discard the feed if one of its authors was bumped since the
+    -- last check, or if the log no longer reaches back that far
+    local checked = redis.call("GET", KEYS[3])
+    local stale = checked == false
+    if not stale then
+        checked = tonumber(checked)
+        local oldest = redis.call("ZRANGE", KEYS[5], 0, 0, "WITHSCORES")
+        if #oldest > 0 and tonumber(oldest[2]) > checked + 1
+                and redis.call("ZCARD", KEYS[5]) >= tonumber(ARGV[4]) then
+            stale = true
+        end
+    end
+    if not stale then
+        local bumped = redis.call("ZRANGEBYSCORE", KEYS[5], "(" .. checked, "+inf")
+        for i = 1, #bumped do
+            if redis.call("SISMEMBER", KEYS[4], bumped[i]) == 1 then
+                stale = true
+                break
+            end
+        end
+    end
+    if stale then
+        redis.call("DEL", KEYS[1], KEYS[3], KEYS[4])
+        return false
+    end
+    redis.call("SET", KEYS[3], redis.call("GET", KEYS[6]) or "0", "KEEPTTL")
+
+    if after ~= "" then
+        local entries = redis.call("LRANGE", KEYS[1], 0, -1)
+        offset = #entries
+        for i = 1, #entries do
+            if entries[i] < after then
+                offset = i - 1
+                break
+            end
+        end
+    end
+
+    if not complete and offset + limit > size then
+        return false
+    end
+
+    local result = {
+        redis.call("PTTL", KEYS[1]),
+        redis.call("GET", KEYS[2]) or "0",
+    }
+    if offset < size then
+        local items = redis.call(
+            "LRANGE", KEYS[1], offset, math.min(offset + limit, size) - 1
+        )
+        for i = 1, #items do
+            result[#result + 1] = items[i]
+        end
+    end
+    return result
+    """
+
+    # O(1) invalidation of every feed built from the author's posts
+    BUMP_AUTHOR_SCRIPT = """
+    local generation = redis.call("INCR", KEYS[1])
+    redis.call("ZADD", KEYS[2], generation, ARGV[1])
+    redis.call("ZREMRANGEBYRANK", KEYS[2], 0, -tonumber(ARGV[2]) - 1)
+    return generation
+    """
+
+    # Versioned post write: skip it if a newer version is already cached
+    WRITE_POST_SCRIPT = """
+    local current = redis.call("GET", KEYS[2])
+    if current and tonumber(current) >= tonumber(ARGV[2]) then
+        return 0
+    end
+    redis.call("SET", KEYS[1], ARGV[1], "EX", ARGV[3])
+    redis.call("SET", KEYS[2], ARGV[2], "EX", ARGV[3])
+    return 1
+    """
+
+    # Write-through for friend sets: only touch sets that are already cached
+    UPDATE_FRIENDS_SCRIPT = """
+    for i = 1, #KEYS do
+        if redis.call("EXISTS", KEYS[i]) == 1 then
+            redis.call(ARGV[1], KEYS[i], ARGV[i + 1])
+        end
+    end
+    return 1
+    """
+
+    # Drop the author's timeline together with the membership
+    REMOVE_HIGH_DEGREE_AUTHOR_SCRIPT = """
+    if redis.call("SREM", KEYS[1], ARGV[1]) == 0 then
+        return 0
+    end
+    redis.call("DEL", KEYS[2])
+    return 1
+    """
+
+    # Delete the lock only if it is still held by the caller
+    RELEASE_LOCK_SCRIPT = """
+    if redis.call("GET", KEYS[1]) == ARGV[1] then
+        return redis.call("DEL", KEYS[1])
+    end
+    return 0
+    """
 
     @staticmethod
     def _get_feed_key(user_id: UUID) -> str:
         return f"{CacheService.FEED_KEY_PREFIX}{user_id}"
 
+    @staticmethod
+    def _get_timeline_key(author_id: UUID) -> str:
+        return f"{CacheService.TIMELINE_KEY_PREFIX}{author_id}"
+
+    @staticmethod
+    def _get_post_key(post_id: UUID | str) -> str:
+        return f"{CacheService.POST_KEY_PREFIX}{post_id}"
+
+    @staticmethod
+    def _get_post_version_key(post_id: UUID | str) -> str:
+        return f"{CacheService.POST_VERSION_KEY_PREFIX}{post_id}"
+
+    @staticmethod
+    def _get_feed_cost_key(user_id: UUID) -> str:
+        return f"{CacheService.FEED_COST_KEY_PREFIX}{user_id}"
+
+    @staticmethod
+    def _get_feed_gen_key(user_id: UUID) -> str:
+        return f"{CacheService.FEED_GEN_KEY_PREFIX}{user_id}"
+
+    @staticmethod
+    def _get_feed_authors_key(user_id: UUID) -> str:
+        return f"{CacheService.FEED_AUTHORS_KEY_PREFIX}{user_id}"
+
+    @staticmethod
+    def _get_friends_key(user_id: UUID) -> str:
+        return f"{CacheService.FRIENDS_KEY_PREFIX}{user_id}"
+
+    @staticmethod
+    def _get_user_key(user_id: UUID) -> str:
+        return f"{CacheService.USER_KEY_PREFIX}{user_id}"
+
+    @staticmethod
+    def _get_search_key(first_name: str, second_name: str) -> str:
+        # Length prefix keeps ("a:b", "c") and ("a", "b:c") apart
+        return (
+            f"{CacheService.SEARCH_KEY_PREFIX}{len(first_name)}:"
+            f"{first_name}:{second_name}"
+        )
+
+    @staticmethod
+    def feed_entry(created_at: datetime | str, post_id: UUID | str) -> str:
+        return f"{to_micros(created_at):016d}:{post_id}"
+
+    @staticmethod
+    def post_feed_entry(post: dict) -> str:
+        return CacheService.feed_entry(post["created_at"], post["id"])
+
+    @staticmethod
+    def entry_post_id(entry: str) -> str:
+        return entry.split(":", 1)[1]
+
+    @staticmethod
+    def entry_cursor(entry: str) -> str:
+        micros, post_id = entry.split(":", 1)
+        return encode_cursor(from_micros(int(micros)), post_id)
+
+    def _set_posts(self, pipe, posts: list[dict]):
+        # Fills from DB reads: never replace a versioned write
+        for post in posts:
+            pipe.set(
+                self._get_post_key(post["id"]),
+                json.dumps(post, default=str),
+                ex=settings.POST_CACHE_TTL,
+                nx=True,
+            )
+
     async def get_feed_from_cache(
-        self, user_id: UUID, offset: int, limit: int
-    ) -> list[dict] | None:
+        self,
+        user_id: UUID,
+        offset: int,
+        limit: int,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> CachedFeed | None:
+        """Read one page of feed entries in a single round trip.
+
+        Returns None when the page must come from the DB: no cached feed, or
+        the page runs past the end of a list that holds only the head of the
+        feed (no FEED_COMPLETE_MARKER).
+        """
+        key = self._get_feed_key(user_id)
+        after_entry = self.feed_entry(*after) if after is not None else ""
+        variant = f"{offset}:{limit}:{after_entry}"
+
+        local_feed = local_cache.get(key, variant)
+        if local_feed is not MISSING:
+            return local_feed
+
+        try:
+            result = await redis_client.script(self.FEED_PAGE_SCRIPT)(
+                keys=[
+                    key,
+                    self._get_feed_cost_key(user_id),
+                    self._get_feed_gen_key(user_id),
+                    self._get_feed_authors_key(user_id),
+                    self.AUTHOR_GENS_KEY,
+                    self.FEED_CLOCK_KEY,
+                ],
+                args=[
+                    offset,
+                    limit,
+                    after_entry,
+                    settings.FEED_AUTHOR_GENS_LOG_SIZE,
+                    self.FEED_COMPLETE_MARKER,
+                ],
+            )
+            if result is None:
+                return None
+
+            ttl_ms, cost, *entries = result
+            cached_feed = CachedFeed(entries, ttl_ms / 1000, float(cost))
+            local_cache.set(key, cached_feed, variant)
+            return cached_feed
+        except Exception as e:
+            logger.error(f"Cache read error: {e}")
+            return None
+
+    async def get_feed_generation(self) -> int:
+        """Current generation; read it before loading a feed from the DB."""
+        try:
+            client = redis_client.get_client()
+            return int(await client.get(self.FEED_CLOCK_KEY) or 0)
+        except Exception as e:
+            logger.error(f"Cache read error: {e}")
+            return 0
+
+    async def set_feed_to_cache(
+        self,
+        user_id: UUID,
+        posts: list[dict],
+        generation: int,
+        author_ids: list[UUID],
+        rebuild_cost: float = 0.0,
+    ) -> bool:
+        """Atomically replace a feed built from `author_ids` at `generation`.
+
+        `rebuild_cost` (seconds) drives early refresh. The whole swap runs in
+        MULTI/EXEC so readers never see a half-built list. Lists of `posts`
+        shorter than FEED_CACHE_SIZE are the whole feed and end with
+        FEED_COMPLETE_MARKER, so short and empty feeds are served from cache.
+        """
         try:
             client = redis_client.get_client()
             key = self._get_feed_key(user_id)
+            authors_key = self._get_feed_authors_key(user_id)
 
-            cache_size = await client.llen(key)
-            if cache_size == 0:
-                return None
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.delete(key, authors_key)
+                entries = [self.post_feed_entry(post) for post in posts]
+                if len(posts) < settings.FEED_CACHE_SIZE:
+                    entries.append(self.FEED_COMPLETE_MARKER)
+                pipe.rpush(key, *entries)
+                if author_ids:
+                    pipe.sadd(authors_key, *[str(uid) for uid in author_ids])
+                    pipe.expire(authors_key, settings.FEED_CACHE_TTL)
+                pipe.expire(key, settings.FEED_CACHE_TTL)
+                pipe.set(
+                    self._get_feed_gen_key(user_id),
+                    generation,
+                    ex=settings.FEED_CACHE_TTL,
+                )
+                pipe.set(
+                    self._get_feed_cost_key(user_id),
+                    rebuild_cost,
+                    ex=settings.FEED_CACHE_TTL,
+                )
+                self._set_posts(pipe, posts)
+                await pipe.execute()
 
-            # If request exceeds cache capacity, go to DB
-            if offset >= settings.FEED_CACHE_SIZE:
-                return None
+            await local_cache.publish_invalidation([key])
+            logger.info(f"Cache updated for user {user_id}: {len(posts)} posts")
+            return True
+        except Exception as e:
+            logger.error(f"Cache write error: {e}")
+            return False
+
+    async def bump_author_generation(self, author_id: UUID) -> bool:
+        """Invalidate all feeds containing the author's posts in O(1)."""
+        try:
+            await redis_client.script(self.BUMP_AUTHOR_SCRIPT)(
+                keys=[self.FEED_CLOCK_KEY, self.AUTHOR_GENS_KEY],
+                args=[str(author_id), settings.FEED_AUTHOR_GENS_LOG_SIZE],
+            )
+            logger.info(f"Feeds invalidated for author {author_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Cache invalidation error: {e}")
+            return False
+
+    async def remove_feed_entries(self, user_id: UUID, entries: list[str]) -> bool:
+        """Drop entries whose posts no longer exist from a cached feed."""
+        try:
+            client = redis_client.get_client()
+            key = self._get_feed_key(user_id)
+            async with client.pipeline(transaction=False) as pipe:
+                for entry in entries:
+                    pipe.lrem(key, 0, entry)
+                await pipe.execute()
+
+            await local_cache.publish_invalidation([key])
+            return True
+        except Exception as e:
+            logger.error(f"Cache write error: {e}")
+            return False
+
+    async def get_posts_from_cache(
+        self, post_ids: list[str]
+    ) -> dict[str, dict | None]:
+        """Fetch cached post bodies, local tier first, then one MGET.
+
+        Missing posts are omitted, deleted (tombstoned) posts map to None.
+        """
+        posts = {}
+        remote_ids = []
+        for post_id in post_ids:
+            local_post = local_cache.get(self._get_post_key(post_id))
+            if local_post is MISSING:
+                remote_ids.append(post_id)
+            else:
+                posts[post_id] = local_post
+
+        if not remote_ids:
+            return posts
+        try:
+            client = redis_client.get_client()
+            cached_data = await client.mget(
+                [self._get_post_key(post_id) for post_id in remote_ids]
+            )
+            for post_id, item in zip(remote_ids, cached_data):
+                if item is None:
+                    continue
+                post = None if item == self.POST_TOMBSTONE else json.loads(item)
+                local_cache.set(self._get_post_key(post_id), post)
+                posts[post_id] = post
+            return posts
+        except Exception as e:
+            logger.error(f"Cache read error: {e}")
+            return posts
+
+    async def set_posts_to_cache(self, posts: list[dict]) -> bool:
+        try:
+            client = redis_client.get_client()
+            async with client.pipeline(transaction=False) as pipe:
+                self._set_posts(pipe, posts)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Cache write error: {e}")
+            return False
+
+    async def get_post_from_cache(self, post_id: UUID) -> dict | None:
+        """Cached post, None for a deleted or unknown post, MISSING if not cached."""
+        posts = await self.get_posts_from_cache([str(post_id)])
+        return posts.get(str(post_id), MISSING)
+
+    async def set_post_not_found(self, post_ids: list[UUID | str]) -> bool:
+        """Remember for a short while that posts do not exist."""
+        try:
+            client = redis_client.get_client()
+            async with client.pipeline(transaction=False) as pipe:
+                for post_id in post_ids:
+                    pipe.set(
+                        self._get_post_key(post_id),
+                        self.POST_TOMBSTONE,
+                        ex=settings.POST_NOT_FOUND_CACHE_TTL,
+                        nx=True,
+                    )
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Cache write error: {e}")
+            return False
+
+    async def _write_post(
+        self, post_id: UUID | str, value: str, version: datetime
+    ) -> bool:
+        try:
+            key = self._get_post_key(post_id)
+            await redis_client.script(self.WRITE_POST_SCRIPT)(
+                keys=[key, self._get_post_version_key(post_id)],
+                args=[value, to_micros(version), settings.POST_CACHE_TTL],
+            )
+            await local_cache.publish_invalidation([key])
+            return True
+        except Exception as e:
+            logger.error(f"Cache write error: {e}")
+            return False
+
+    async def write_post(self, post: dict, version: datetime) -> bool:
+        """Write a created or edited post, feeds referencing it stay warm."""
+        return await self._write_post(
+            post["id"], json.dumps(post, default=str), version
+        )
 
-            # If cache is full (1000 posts) but user wants beyond that, go to DB
-            if cache_size >= settings.FEED_CACHE_SIZE and offset + limit > cache_size:
+    async def tombstone_post(self, post_id: UUID, version: datetime) -> bool:
+        """Mark a post as deleted so readers drop it without asking the DB."""
+        return await self._write_post(post_id, self.POST_TOMBSTONE, version)
+
+    async def get_friend_ids(self, user_id: UUID) -> list[UUID] | None:
+        """Cached friend ids of the user, None if the set is not loaded."""
+        try:
+            client = redis_client.get_client()
+            members = await client.smembers(self._get_friends_key(user_id))
+            if self.FRIENDS_LOADED_MARKER not in members:
                 return None
+            return [
+                UUID(member)
+                for member in members
+                if member != self.FRIENDS_LOADED_MARKER
+            ]
+        except Exception as e:
+            logger.error(f"Cache read error: {e}")
+            return None
 
-            # If offset beyond cache size, return empty (no more data exists)
-            if offset >= cache_size:
-                return []
+    async def set_friend_ids(self, user_id: UUID, friend_ids: list[UUID]) -> bool:
+        try:
+            client = redis_client.get_client()
+            key = self._get_friends_key(user_id)
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.sadd(
+                    key,
+                    self.FRIENDS_LOADED_MARKER,
+                    *[str(friend_id) for friend_id in friend_ids],
+                )
+                pipe.expire(key, settings.FRIENDS_CACHE_TTL)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Cache write error: {e}")
+            return False
 
-            cached_data = await client.lrange(key, offset, offset + limit - 1)
-            return [json.loads(item) for item in cached_data]
+    async def get_friend_ids_among(
+        self, user_id: UUID, candidate_ids: list[UUID]
+    ) -> list[UUID] | None:
+        """Which candidates are friends of the user, None if the set is not loaded."""
+        try:
+            client = redis_client.get_client()
+            flags = await client.smismember(
+                self._get_friends_key(user_id),
+                [self.FRIENDS_LOADED_MARKER, *[str(uid) for uid in candidate_ids]],
+            )
+            if not flags[0]:
+                return None
+            return [uid for uid, flag in zip(candidate_ids, flags[1:]) if flag]
         except Exception as e:
             logger.error(f"Cache read error: {e}")
             return None
 
-    async def set_feed_to_cache(self, user_id: UUID, posts: list[dict]) -> bool:
+    async def _update_friendships(
+        self, command: str, user_id: UUID, friend_ids: list[UUID]
+    ) -> bool:
+        """Apply both directions of many friendship changes in one script call."""
+        if not friend_ids:
+            return True
+
+        keys, members = [], []
+        for friend_id in friend_ids:
+            keys += [self._get_friends_key(user_id), self._get_friends_key(friend_id)]
+            members += [str(friend_id), str(user_id)]
+        try:
+            await redis_client.script(self.UPDATE_FRIENDS_SCRIPT)(
+                keys=keys, args=[command, *members]
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Cache write error: {e}")
+            return False
+
+    async def add_friendship(self, user_id: UUID, friend_id: UUID) -> bool:
+        return await self._update_friendships("SADD", user_id, [friend_id])
+
+    async def remove_friendship(self, user_id: UUID, friend_id: UUID) -> bool:
+        return await self._update_friendships("SREM", user_id, [friend_id])
+
+    async def add_friendships(self, user_id: UUID, friend_ids: list[UUID]) -> bool:
+        return await self._update_friendships("SADD", user_id, friend_ids)
+
+    async def remove_friendships(self, user_id: UUID, friend_ids: list[UUID]) -> bool:
+        return await self._update_friendships("SREM", user_id, friend_ids)
+
+    async def get_user_from_cache(self, user_id: UUID) -> dict | None:
+        """Cached profile, None for a known-missing user, MISSING if not cached."""
+        key = self._get_user_key(user_id)
+        user = local_cache.get(key)
+        if user is not MISSING:
+            return user
+
         try:
             client = redis_client.get_client()
-            key = self._get_feed_key(user_id)
+            cached_data = await client.get(key)
+            if cached_data is None:
+                return MISSING
+            user = None if cached_data == self.USER_NOT_FOUND else json.loads(cached_data)
+            local_cache.set(key, user)
+            return user
+        except Exception as e:
+            logger.error(f"Cache read error: {e}")
+            return MISSING
+
+    async def set_user_to_cache(self, user_id: UUID, user: dict | None) -> bool:
+        """Cache a profile, or remember for a short while that it does not exist.
+
+        The negative entry never replaces a cached profile: a read from a
+        lagging replica must not hide a user written through by write_user.
+        """
+        try:
+            client = redis_client.get_client()
+            if user is None:
+                await client.set(
+                    self._get_user_key(user_id),
+                    self.USER_NOT_FOUND,
+                    ex=settings.USER_NOT_FOUND_CACHE_TTL,
+                    nx=True,
+                )
+            else:
+                await client.set(
+                    self._get_user_key(user_id),
+                    json.dumps(user, default=str),
+                    ex=settings.USER_CACHE_TTL,
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Cache write error: {e}")
+            return False
 
-            await client.delete(key)
+    async def write_user(self, user: dict) -> bool:
+        """Write a new or changed profile, replacing any negative entry."""
+        try:
+            client = redis_client.get_client()
+            key = self._get_user_key(user["id"])
+            await client.set(
+                key, json.dumps(user, default=str), ex=settings.USER_CACHE_TTL
+            )
+            await local_cache.publish_invalidation([key])
+            return True
+        except Exception as e:
+            logger.error(f"Cache write error: {e}")
+            return False
 
-            if posts:
-                serialized = [json.dumps(post, default=str) for post in posts]
-                await client.rpush(key, *serialized)
+    async def get_search_from_cache(
+        self, first_name: str, second_name: str, page: str
+    ) -> list[dict] | None:
+        """Cached page of a normalized (lowercased) prefix search, None on a miss.
 
-            await client.expire(key, settings.FEED_CACHE_TTL)
+        All pages of one search share a hash, so invalidation drops them together.
+        """
+        key = self._get_search_key(first_name, second_name)
+        users = local_cache.get(key, page)
+        if users is not MISSING:
+            return users
 
-            logger.info(f"Cache updated for user {user_id}: {len(posts)} posts")
+        try:
+            client = redis_client.get_client()
+            cached_data = await client.hget(key, page)
+            if cached_data is None:
+                return None
+            users = json.loads(cached_data)
+            local_cache.set(key, users, page)
+            return users
+        except Exception as e:
+            logger.error(f"Cache read error: {e}")
+            return None
+
+    async def set_search_to_cache(
+        self, first_name: str, second_name: str, page: str, users: list[dict]
+    ) -> bool:
+        try:
+            client = redis_client.get_client()
+            key = self._get_search_key(first_name, second_name)
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, page, json.dumps(users, default=str))
+                # Later pages must not extend the lifetime of earlier ones
+                pipe.expire(key, settings.SEARCH_CACHE_TTL, nx=True)
+                await pipe.execute()
             return True
         except Exception as e:
             logger.error(f"Cache write error: {e}")
             return False
 
+    async def invalidate_searches_matching(
+        self, first_name: str, second_name: str
+    ) -> bool:
+        """Drop every cached search whose prefixes match a new user's name."""
+        first_name, second_name = first_name.lower(), second_name.lower()
+        keys = [
+            self._get_search_key(first_name[:i], second_name[:j])
+            for i in range(2, len(first_name) + 1)
+            for j in range(2, len(second_name) + 1)
+        ]
+        if not keys:
+            return True
+
+        try:
+            client = redis_client.get_client()
+            await client.unlink(*keys)
+            await local_cache.publish_invalidation(keys)
+            return True
+        except Exception as e:
+            logger.error(f"Cache invalidation error: {e}")
+            return False
+
+    async def feed_exists(self, user_id: UUID) -> bool:
+        try:
+            client = redis_client.get_client()
+            return bool(await client.exists(self._get_feed_key(user_id)))
+        except Exception as e:
+            logger.error(f"Cache read error: {e}")
+            return False
+
+    async def acquire_lock(self, name: str, ttl: int) -> str | None:
+        """Try to take a cross-instance lock, returns its token or None if busy.
+
+        Fails open: if Redis is unavailable the caller gets a token and proceeds.
+        """
+        token = uuid4().hex
+        try:
+            client = redis_client.get_client()
+            acquired = await client.set(
+                f"{self.LOCK_KEY_PREFIX}{name}", token, nx=True, ex=ttl
+            )
+            return token if acquired else None
+        except Exception as e:
+            logger.error(f"Cache lock error: {e}")
+            return token
+
+    async def lock_exists(self, name: str) -> bool:
+        try:
+            client = redis_client.get_client()
+            return bool(await client.exists(f"{self.LOCK_KEY_PREFIX}{name}"))
+        except Exception as e:
+            logger.error(f"Cache read error: {e}")
+            return False
+
+    async def release_lock(self, name: str, token: str) -> bool:
+        try:
+            released = await redis_client.script(self.RELEASE_LOCK_SCRIPT)(
+                keys=[f"{self.LOCK_KEY_PREFIX}{name}"], args=[token]
+            )
+            return bool(released)
+        except Exception as e:
+            logger.error(f"Cache unlock error: {e}")
+            return False
+
+    async def push_post_to_feeds(self, user_ids: list[UUID], post: dict) -> bool:
+        """Prepend a new post to the cached feeds of the given users.
+
+        Only feeds that are already cached are touched (LPUSHX), users without
+        a cached feed will get the post on their next rebuild from the DB.
+        The post body is expected to be cached already (write_post).
+        """
+        try:
+            client = redis_client.get_client()
+            entry = self.post_feed_entry(post)
+            batch_size = settings.FEED_FANOUT_BATCH_SIZE
+
+            for start in range(0, len(user_ids), batch_size):
+                keys = [
+                    self._get_feed_key(uid)
+                    for uid in user_ids[start : start + batch_size]
+                ]
+                async with client.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        pipe.lpushx(key, entry)
+                        pipe.ltrim(key, 0, settings.FEED_CACHE_SIZE - 1)
+                    await pipe.execute()
+                await local_cache.publish_invalidation(keys)
+
+            logger.info(f"Post {post['id']} pushed to {len(user_ids)} feed(s)")
+            return True
+        except Exception as e:
+            logger.error(f"Cache fan-out error: {e}")
+            return False
+
+    async def push_post_to_timeline(self, author_id: UUID, post: dict) -> bool:
+        """Store a post of a high-degree author in the author's own timeline.
+
+        Readers merge these timelines into their feeds at read time, so the
+        write costs O(1) regardless of the author's friend count. The timeline
+        lives FEED_CACHE_TTL after the last post: feeds built before that post,
+        which need it, expire no later.
+        """
+        try:
+            client = redis_client.get_client()
+            key = self._get_timeline_key(author_id)
+
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.sadd(self.HIGH_DEGREE_AUTHORS_KEY, str(author_id))
+                pipe.lpush(key, self.post_feed_entry(post))
+                pipe.ltrim(key, 0, settings.FEED_CACHE_SIZE - 1)
+                pipe.expire(key, settings.FEED_CACHE_TTL)
+                await pipe.execute()
+
+            logger.info(f"Post {post['id']} pushed to timeline of author {author_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Timeline write error: {e}")
+            return False
+
+    async def remove_from_timeline(self, author_id: UUID, entry: str) -> bool:
+        try:
+            client = redis_client.get_client()
+            await client.lrem(self._get_timeline_key(author_id), 0, entry)
+            return True
+        except Exception as e:
+            logger.error(f"Timeline write error: {e}")
+            return False
+
+    async def remove_high_degree_author(self, author_id: UUID) -> bool:
+        """Stop merging the timeline of an author who fell below the threshold.
+
+        Returns True if the author was high-degree; feeds that relied on the
+        timeline must then be invalidated (bump_author_generation).
+        """
+        try:
+            removed = await redis_client.script(self.REMOVE_HIGH_DEGREE_AUTHOR_SCRIPT)(
+                keys=[self.HIGH_DEGREE_AUTHORS_KEY, self._get_timeline_key(author_id)],
+                args=[str(author_id)],
+            )
+            return bool(removed)
+        except Exception as e:
+            logger.error(f"Timeline write error: {e}")
+            return False
+
+    async def get_followed_high_degree_authors(
+        self, user_id: UUID
+    ) -> list[UUID] | None:
+        """High-degree friends of the user, None if the friend set is not loaded."""
+        try:
+            client = redis_client.get_client()
+            friends_key = self._get_friends_key(user_id)
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.sismember(friends_key, self.FRIENDS_LOADED_MARKER)
+                pipe.sinter(friends_key, self.HIGH_DEGREE_AUTHORS_KEY)
+                loaded, members = await pipe.execute()
+            if not loaded:
+                return None
+            return [UUID(member) for member in members]
+        except Exception as e:
+            logger.error(f"Cache read error: {e}")
+            return []
+
+    async def get_timelines(
+        self,
+        author_ids: list[UUID],
+        count: int,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> list[str] | None:
+        """Return up to `count` newest entries (older than `after`) per author."""
+        try:
+            client = redis_client.get_client()
+            end = -1 if after is not None else count - 1
+            async with client.pipeline(transaction=False) as pipe:
+                for author_id in author_ids:
+                    pipe.lrange(self._get_timeline_key(author_id), 0, end)
+                timelines = await pipe.execute()
+
+            after_entry = self.feed_entry(*after) if after is not None else None
+            entries = []
+            for timeline in timelines:
+                if after_entry is not None:
+                    timeline = [entry for entry in timeline if entry < after_entry]
+                entries.extend(timeline[:count])
+            return entries
+        except Exception as e:
+            logger.error(f"Timeline read error: {e}")
+            return None
+
     async def invalidate_feeds(self, user_ids: list[UUID]) -> bool:
         try:
             client = redis_client.get_client()
             keys = [self._get_feed_key(uid) for uid in user_ids]
             if keys:
                 await client.delete(*keys)
+                await local_cache.publish_invalidation(keys)
                 logger.info(f"Cache invalidated for {len(keys)} user(s)")
             return True
         except Exception as e:
@@ -0,0 +1,181 @@
+"""Optional in-memory friendship graph for mutual friends and suggestions."""
+
+import asyncio
+import json
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain, islice
+from uuid import UUID
+
+from app.core.db_manager import db_manager
+from app.core.redis_client import redis_client
+from app.logger import logger
+from app.repositories.user_repository import UserRepository
+from app.settings import settings
+
+EDGES_CHANNEL = "friend_graph:edges"
+
+
+class FriendGraph:
+    """Adjacency lists of compact integer ids, one sorted array per user.
+
+    User ids (as strings, whatever UUID type they arrive in) are mapped to
+    dense ints on first sight, so a friend list costs 4 bytes per friend.
+    Intersections and friend-of-friend counts run in C (set.intersection,
+    Counter over chained arrays) instead of Python loops or SQL self-joins.
+
+    Loaded from a replica at startup; friendship changes on any instance
+    are published on EDGES_CHANNEL and applied by every instance.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.ready = False
+        self._ids: dict[str, int] = {}
+        self._user_ids: list[str] = []
+        self._friends: list[array] = []
+
+    def _id(self, user_id: UUID | str) -> int:
+        user_id = str(user_id)
+        node = self._ids.get(user_id)
+        if node is None:
+            node = len(self._user_ids)
+            self._ids[user_id] = node
+            self._user_ids.append(user_id)
+            self._friends.append(array("i"))
+        return node
+
+    def _link(self, node: int, friend: int):
+        friends = self._friends[node]
+        i = bisect_left(friends, friend)
+        if i == len(friends) or friends[i] != friend:
+            friends.insert(i, friend)
+
+    def _unlink(self, node: int, friend: int):
+        friends = self._friends[node]
+        i = bisect_left(friends, friend)
+        if i < len(friends) and friends[i] == friend:
+            del friends[i]
+
+    def add_friendship(self, user_id: UUID | str, friend_id: UUID | str):
+        node, friend = self._id(user_id), self._id(friend_id)
+        self._link(node, friend)
+        self._link(friend, node)
+
+    def remove_friendship(self, user_id: UUID | str, friend_id: UUID | str):
+        node, friend = self._ids.get(str(user_id)), self._ids.get(str(friend_id))
+        if node is None or friend is None:
+            return
+        self._unlink(node, friend)
+        self._unlink(friend, node)
+
+    def mutual_friends(
+        self, user_id: UUID | str, other_id: UUID | str
+    ) -> list[str]:
+        """Ids of the common friends of two users, in id order."""
+        node, other = self._ids.get(str(user_id)), self._ids.get(str(other_id))
+        if node is None or other is None:
+            return []
+
+        smaller, larger = sorted(
+            (self._friends[node], self._friends[other]), key=len
+        )
+        common = set(smaller).intersection(larger)
+        return sorted(self._user_ids[friend] for friend in common)
+
+    def suggestions(
+        self, user_id: UUID | str, limit: int
+    ) -> list[tuple[str, int]]:
+        """Friends of friends ranked by the number of mutual friends.
+
+        Only the first FRIEND_GRAPH_MAX_SCANNED_FRIENDS friends are expanded,
+        which bounds the work for very well-connected users.
+        """
+        node = self._ids.get(str(user_id))
+        if node is None:
+            return []
+
+        friends = self._friends[node]
+        scanned = islice(friends, settings.FRIEND_GRAPH_MAX_SCANNED_FRIENDS)
+        counts = Counter(chain.from_iterable(self._friends[f] for f in scanned))
+
+        counts.pop(node, None)
+        for friend in friends:
+            counts.pop(friend, None)
+
+        return [
+            (self._user_ids[candidate], mutual)
+            for candidate, mutual in counts.most_common(limit)
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "users": len(self._user_ids),
+            "edges": sum(len(friends) for friends in self._friends) // 2,
+        }
+
+    async def load(self):
+        """Rebuild the graph from a replica and swap it in."""
+        graph = FriendGraph(self.enabled)
+        async with db_manager.read_session() as session:
+            repository = UserRepository(session)
+            async for batch in repository.iter_friendships(
+                settings.FRIEND_GRAPH_LOAD_BATCH_SIZE
+            ):
+                for user_id, friend_id in batch:
+                    # Friendships are stored in both directions
+                    graph._friends[graph._id(user_id)].append(graph._id(friend_id))
+                # Let requests run between batches
+                await asyncio.sleep(0)
+
+        self._ids = graph._ids
+        self._user_ids = graph._user_ids
+        self._friends = [array("i", sorted(set(friends))) for friends in graph._friends]
+        self.ready = True
+        logger.info(f"Friend graph loaded: {self.stats()}")
+
+    async def publish(
+        self, action: str, user_id: UUID | str, friend_ids: list[UUID | str]
+    ):
+        """Apply friendship changes of one user here and on every other instance."""
+        if not self.enabled or not friend_ids:
+            return
+
+        friend_ids = [str(friend_id) for friend_id in friend_ids]
+        self._apply(action, str(user_id), friend_ids)
+        try:
+            await redis_client.get_client().publish(
+                EDGES_CHANNEL, json.dumps([action, str(user_id), friend_ids])
+            )
+        except Exception as e:
+            logger.error(f"Friend graph publish error: {e}")
+
+    def _apply(self, action: str, user_id: str, friend_ids: list[str]):
+        for friend_id in friend_ids:
+            if action == "add":
+                self.add_friendship(user_id, friend_id)
+            else:
+                self.remove_friendship(user_id, friend_id)
+
+    async def run(self):
+        """Subscribe to friendship changes, then (re)load; reconnects on errors.
+
+        Changes made during the load are queued on the subscription and
+        applied afterwards (both operations are idempotent).
+        """
+        if not self.enabled:
+            return
+
+        await redis_client.listen(
+            EDGES_CHANNEL,
+            lambda data: self._apply(*json.loads(data)),
+            # Changes may have been missed while disconnected
+            self.load,
+            "Friend graph",
+        )
+
+
+friend_graph = FriendGraph(enabled=settings.FRIEND_GRAPH_ENABLED)
@@ -0,0 +1,125 @@
+"""Optional in-memory prefix index over user names."""
+
+import asyncio
+import json
+from bisect import bisect_left, bisect_right
+from uuid import UUID
+
+from app.core.db_manager import db_manager
+from app.core.redis_client import redis_client
+from app.logger import logger
+from app.repositories.user_repository import UserRepository
+from app.settings import settings
+
+USERS_CHANNEL = "search_index:users"
+
+# Separates the parts of an index key; sorts below any character of a name,
+# so keys compare like (first_name, second_name, id) tuples
+_SEP = "\0"
+
+
+def _make_key(first_name: str, second_name: str, user_id: UUID | str) -> str:
+    return f"{first_name}{_SEP}{second_name}{_SEP}{user_id}"
+
+
+class UserSearchIndex:
+    """Sorted array of "first\\0second\\0id" keys (lowercased names).
+
+    Keys are in the same order as the ix_users_search_keyset index ("C"
+    collation compares UTF-8 bytes, Python compares code points, which is
+    the same order), so a page from memory continues a page from the DB and
+    vice versa with the same cursor.
+
+    Loaded from a replica at startup; registrations on any instance are
+    published on USERS_CHANNEL and applied by every instance.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.ready = False
+        self._keys: list[str] = []
+
+    def add(self, first_name: str, second_name: str, user_id: UUID | str):
+        key = _make_key(first_name, second_name, user_id)
+        i = bisect_left(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            self._keys.insert(i, key)
+
+    def search(
+        self,
+        first_name: str,
+        second_name: str,
+        limit: int,
+        after: tuple[str, str, UUID] | None = None,
+    ) -> list[tuple[str, str, str]]:
+        """(first_name, second_name, id) of users matching both prefixes, in key order."""
+        keys = self._keys
+        start = bisect_left(keys, first_name)
+        if after is not None:
+            start = max(start, bisect_right(keys, _make_key(*after)))
+
+        matches = []
+        for i in range(start, len(keys)):
+            key = keys[i]
+            if not key.startswith(first_name):
+                break
+            first, second, user_id = key.split(_SEP)
+            if second.startswith(second_name):
+                matches.append((first, second, user_id))
+                if len(matches) == limit:
+                    break
+        return matches
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "ready": self.ready, "size": len(self._keys)}
+
+    async def load(self):
+        """Rebuild the index from a replica and swap it in."""
+        keys = []
+        async with db_manager.read_session() as session:
+            repository = UserRepository(session)
+            async for batch in repository.iter_search_keys(
+                settings.SEARCH_INDEX_LOAD_BATCH_SIZE
+            ):
+                keys.extend(_make_key(*row) for row in batch)
+                # Let requests run between batches
+                await asyncio.sleep(0)
+        keys.sort()
+        self._keys = keys
+        self.ready = True
+        logger.info(f"User search index loaded: {len(keys)} users")
+
+    async def publish_user(self, first_name: str, second_name: str, user_id: UUID):
+        """Index a new user here and on every other instance."""
+        if not self.enabled:
+            return
+
+        first_name, second_name = first_name.lower(), second_name.lower()
+        self.add(first_name, second_name, user_id)
+        try:
+            await redis_client.get_client().publish(
+                USERS_CHANNEL,
+                json.dumps([first_name, second_name, str(user_id)]),
+            )
+        except Exception as e:
+            logger.error(f"Search index publish error: {e}")
+
+    async def run(self):
+        """Subscribe to registrations, then (re)load; reconnects on errors.
+
+        Subscribing first means registrations made during the load are
+        queued on the connection and applied afterwards (adds are idempotent).
+        """
+        if not self.enabled:
+            return
+
+        await redis_client.listen(
+            USERS_CHANNEL,
+            lambda data: self.add(*json.loads(data)),
+            # Registrations may have been missed while disconnected
+            self.load,
+            "Search index",
+        )
+
+
+search_index = UserSearchIndex(enabled=settings.SEARCH_INDEX_ENABLED)
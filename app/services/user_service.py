@@ -1,15 +1,66 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.user_repository import UserRepository
-from app.schemas.user import UserCreate, UserRegisterResponse, UserResponse
-from app.core.security import hash_password
+from app.schemas.user import (
+    FriendsBulkRequest,
+    FriendsBulkResponse,
+    FriendSuggestion,
+    UserCreate,
+    UserPage,
+    UserRegisterResponse,
+    UserResponse,
+)
+from app.core.password_pool import password_pool
 from uuid import UUID
 from app.core.exceptions import AppError
 from app.resources import strings
 from fastapi import status
-from app.schemas.post import PostCreate, PostResponse, PostUpdate
-from app.services.cache_service import CacheService
+from app.schemas.post import FeedPage, PostCreate, PostResponse, PostUpdate
+from app.services.cache_service import CachedFeed, CacheService
 from app.settings import settings
 from app.logger import logger
+from app.utils.cursor import (
+    decode_cursor,
+    decode_id_cursor,
+    decode_name_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_id_cursor,
+    encode_name_cursor,
+    encode_rank_cursor,
+)
+from app.core.db_manager import db_manager
+from app.core.local_cache import MISSING
+from app.core.single_flight import SingleFlight
+from app.services.search_index import search_index
+from app.services.friend_graph import friend_graph
+from bisect import bisect_right
+from datetime import datetime
+import asyncio
+import math
+import random
+import time
+
+# Keeps references to fire-and-forget tasks so they are not garbage collected
+_background_tasks: set[asyncio.Task] = set()
+
+# In-process coalescing of feed cache rebuilds, keyed by user id
+_feed_rebuilds = SingleFlight()
+
+# In-process coalescing of identical user searches, keyed by normalized query
+_searches = SingleFlight()
+
+
+def _run_in_background(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _publish_post_events(friend_ids: list[UUID], post_message: dict):
+    from app.core.rabbitmq_client import rabbitmq_client
+
+    for friend_id in friend_ids:
+        await rabbitmq_client.publish_post_event(str(friend_id), post_message)
 
 
 class UserService:
@@ -17,34 +68,215 @@ class UserService:
         self.repository = UserRepository(db)
         self.cache = CacheService()
 
-    async def _invalidate_friends_cache(self, user_id: UUID):
-        """Invalidate cache for all friends of the user"""
-        friends = await self.repository.get_friend_ids(user_id)
-        if friends:
-            await self.cache.invalidate_feeds(friends)
+    async def _load_friend_ids(self, user_id: UUID) -> list[UUID]:
+        """Fill the cached friend set from the master.
+
+        The set is kept for FRIENDS_CACHE_TTL and write-through only updates
+        loaded sets, so a set filled from a lagging replica would miss a new
+        friend for the whole TTL.
+        """
+        async with db_manager.write_session() as session:
+            friend_ids = await UserRepository(session).get_friend_ids(user_id) or []
+        await self.cache.set_friend_ids(user_id, friend_ids)
+        return friend_ids
+
+    async def _get_friend_ids(self, user_id: UUID) -> list[UUID]:
+        """Friend ids from the Redis set, loaded from the DB on a miss."""
+        friend_ids = await self.cache.get_friend_ids(user_id)
+        if friend_ids is None:
+            friend_ids = await self._load_friend_ids(user_id)
+        return friend_ids
+
+    async def _get_friend_ids_among(
+        self, user_id: UUID, candidate_ids: list[UUID]
+    ) -> list[UUID]:
+        friend_ids = await self.cache.get_friend_ids_among(user_id, candidate_ids)
+        if friend_ids is None:
+            candidates = {str(uid) for uid in candidate_ids}
+            friend_ids = [
+                friend_id
+                for friend_id in await self._get_friend_ids(user_id)
+                if str(friend_id) in candidates
+            ]
+        return friend_ids
+
+    async def _get_user(self, user_id: UUID) -> dict | None:
+        """Profile from the cache, read through to the DB on a miss.
+
+        Unknown ids are cached too, so repeated lookups of a missing user
+        do not reach the replicas either.
+        """
+        user = await self.cache.get_user_from_cache(user_id)
+        if user is MISSING:
+            user = await self.repository.get_by_id_with_raw_sql(user_id)
+            await self.cache.set_user_to_cache(user_id, user)
+        return user
 
     async def create_user(self, user_data: UserCreate) -> UserRegisterResponse:
-        hashed_password = hash_password(user_data.password)
+        hashed_password = await password_pool.hash_password(user_data.password)
         user_id = await self.repository.create_with_raw_sql(user_data, hashed_password)
+        # Write-through: reads from a lagging replica would cache "not found"
+        await self.cache.write_user(
+            {
+                "id": user_id,
+                "first_name": user_data.first_name,
+                "second_name": user_data.second_name,
+                "birthdate": user_data.birthdate.date(),
+                "biography": user_data.biography,
+                "city": user_data.city,
+            }
+        )
+        await self.cache.invalidate_searches_matching(
+            user_data.first_name, user_data.second_name
+        )
+        await search_index.publish_user(
+            user_data.first_name, user_data.second_name, user_id
+        )
         return UserRegisterResponse(user_id=str(user_id))
 
     async def get_user_by_id(self, user_id: UUID) -> UserResponse | None:
-        db_user = await self.repository.get_by_id_with_raw_sql(user_id)
+        db_user = await self._get_user(user_id)
         if db_user:
             return UserResponse.model_validate(db_user)
 
         return None
 
+    async def _search_users_once(
+        self,
+        first_name: str,
+        second_name: str,
+        limit: int,
+        cursor: str | None,
+    ) -> list[dict]:
+        """Run the search on its own session, the result is shared by waiters.
+
+        Fetches one extra row to tell whether a next page exists.
+        """
+        after = decode_name_cursor(cursor) if cursor else None
+        async with db_manager.read_session() as session:
+            db_users = await UserRepository(session).search_users_with_raw_sql(
+                first_name, second_name, limit + 1, after
+            )
+        db_users = db_users or []
+        await self.cache.set_search_to_cache(
+            first_name, second_name, f"{limit}:{cursor or ''}", db_users
+        )
+        return db_users
+
+    async def _search_users_in_index(
+        self,
+        first_name: str,
+        second_name: str,
+        limit: int,
+        cursor: str | None,
+    ) -> list[dict]:
+        """Match prefixes in memory, fetch only the matched rows by primary key."""
+        after = decode_name_cursor(cursor) if cursor else None
+        matches = search_index.search(first_name, second_name, limit + 1, after)
+        if not matches:
+            return []
+
+        db_users = await self.repository.get_users_by_ids(
+            [UUID(user_id) for _, _, user_id in matches]
+        )
+        users_by_id = {str(user["id"]): user for user in db_users or []}
+
+        # Rows not replicated yet are skipped
+        return [
+            {
+                **users_by_id[user_id],
+                "first_name_key": first_key,
+                "second_name_key": second_key,
+            }
+            for first_key, second_key, user_id in matches
+            if user_id in users_by_id
+        ]
+
     async def search_users(
-        self, first_name: str, second_name: str
-    ) -> list[UserResponse] | None:
-        db_users = await self.repository.search_users_with_raw_sql(
-            first_name, second_name
+        self,
+        first_name: str,
+        second_name: str,
+        limit: int,
+        cursor: str | None = None,
+    ) -> UserPage:
+        # The query is case-insensitive, so is the cache key
+        first_name, second_name = first_name.lower(), second_name.lower()
+        page = f"{limit}:{cursor or ''}"
+
+        if search_index.ready:
+            db_users = await self._search_users_in_index(
+                first_name, second_name, limit, cursor
+            )
+        else:
+            db_users = await self.cache.get_search_from_cache(
+                first_name, second_name, page
+            )
+        if db_users is None:
+            db_users = await _searches.do(
+                f"{CacheService._get_search_key(first_name, second_name)}:{page}",
+                lambda: self._search_users_once(
+                    first_name, second_name, limit, cursor
+                ),
+            )
+
+        next_cursor = None
+        if len(db_users) > limit:
+            db_users = db_users[:limit]
+            last = db_users[-1]
+            next_cursor = encode_name_cursor(
+                last["first_name_key"], last["second_name_key"], last["id"]
+            )
+
+        return UserPage(
+            users=[UserResponse.model_validate(user) for user in db_users],
+            next_cursor=next_cursor,
         )
-        if db_users:
-            return [UserResponse.model_validate(user) for user in db_users]
 
-        return None
+    async def _search_ranked(
+        self, search, query: str, limit: int, cursor: str | None
+    ) -> tuple[list[dict], str | None]:
+        """One page of a ranked search, fetching one extra row to detect a next page."""
+        after = decode_rank_cursor(cursor) if cursor else None
+        rows = await search(query, limit + 1, after) or []
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_rank_cursor(rows[-1]["rank"], rows[-1]["id"])
+        return rows, next_cursor
+
+    async def search_users_by_name(
+        self, query: str, limit: int, cursor: str | None = None
+    ) -> UserPage:
+        rows, next_cursor = await self._search_ranked(
+            self.repository.search_users_by_name, query, limit, cursor
+        )
+        return UserPage(
+            users=[UserResponse.model_validate(row) for row in rows],
+            next_cursor=next_cursor,
+        )
+
+    async def search_users_by_biography(
+        self, query: str, limit: int, cursor: str | None = None
+    ) -> UserPage:
+        rows, next_cursor = await self._search_ranked(
+            self.repository.search_users_by_biography, query, limit, cursor
+        )
+        return UserPage(
+            users=[UserResponse.model_validate(row) for row in rows],
+            next_cursor=next_cursor,
+        )
+
+    async def search_posts(
+        self, query: str, limit: int, cursor: str | None = None
+    ) -> FeedPage:
+        rows, next_cursor = await self._search_ranked(
+            self.repository.search_posts, query, limit, cursor
+        )
+        return FeedPage(
+            posts=[PostResponse.model_validate(row) for row in rows],
+            next_cursor=next_cursor,
+        )
 
     async def add_friend(self, current_user_id: UUID, friend_id: UUID):
         # Check if trying to add self
@@ -54,7 +286,7 @@ class UserService:
             )
 
         # Check if friend exists
-        friend = await self.repository.get_by_id_with_raw_sql(friend_id)
+        friend = await self._get_user(friend_id)
         if not friend:
             raise AppError(strings.NOT_FOUND_USER_ERROR_MSG, status.HTTP_404_NOT_FOUND)
 
@@ -62,12 +294,14 @@ class UserService:
         await self.repository.add_friend(current_user_id, friend_id)
 
         # Invalidate both users' feeds (mutual friendship)
+        await self.cache.add_friendship(current_user_id, friend_id)
         await self.cache.invalidate_feeds([current_user_id, friend_id])
+        await friend_graph.publish("add", current_user_id, [friend_id])
 
     async def delete_friend(self, current_user_id: UUID, friend_id: UUID):
         # Check if friendship exists
-        existing_friendship = await self.repository.get_friendship_raw_sql(
-            current_user_id, friend_id
+        existing_friendship = await self._get_friend_ids_among(
+            current_user_id, [friend_id]
         )
         if not existing_friendship:
             raise AppError(
@@ -78,39 +312,199 @@ class UserService:
         await self.repository.delete_friend(current_user_id, friend_id)
 
         # Invalidate both users' feeds (mutual friendship)
+        await self.cache.remove_friendship(current_user_id, friend_id)
         await self.cache.invalidate_feeds([current_user_id, friend_id])
+        await friend_graph.publish("remove", current_user_id, [friend_id])
+
+    async def update_friends_bulk(
+        self, current_user_id: UUID, request: FriendsBulkRequest
+    ) -> FriendsBulkResponse:
+        """Add or remove many friends with one query per step and one cache update."""
+        friend_ids = [
+            friend_id
+            for friend_id in dict.fromkeys(request.user_ids)
+            if str(friend_id) != str(current_user_id)
+        ]
+        if request.action == "add":
+            found = await self.repository.get_existing_user_ids(friend_ids)
+        else:
+            found = await self._get_friend_ids_among(current_user_id, friend_ids)
+        found = {str(friend_id) for friend_id in found}
+        updated = [friend_id for friend_id in friend_ids if str(friend_id) in found]
+        not_found = [friend_id for friend_id in friend_ids if str(friend_id) not in found]
+
+        if updated:
+            if request.action == "add":
+                await self.repository.add_friends(current_user_id, updated)
+                await self.cache.add_friendships(current_user_id, updated)
+            else:
+                await self.repository.delete_friends(current_user_id, updated)
+                await self.cache.remove_friendships(current_user_id, updated)
+
+            await self.cache.invalidate_feeds([current_user_id, *updated])
+            await friend_graph.publish(request.action, current_user_id, updated)
+
+        return FriendsBulkResponse(updated=updated, not_found=not_found)
+
+    async def get_friends_list(
+        self,
+        user_id: UUID,
+        limit: int,
+        cursor: str | None = None,
+        with_total: bool = False,
+    ) -> UserPage:
+        after = decode_name_cursor(cursor) if cursor else None
+        db_friends = (
+            await self.repository.get_friends_list(user_id, limit + 1, after) or []
+        )
 
-    async def get_friends_list(self, user_id: UUID) -> list[UserResponse] | None:
-        db_friends = await self.repository.get_friends_list(user_id)
-        if db_friends:
-            return [UserResponse.model_validate(friend) for friend in db_friends]
-        return None
+        next_cursor = None
+        if len(db_friends) > limit:
+            db_friends = db_friends[:limit]
+            last = db_friends[-1]
+            next_cursor = encode_name_cursor(
+                last["first_name"], last["second_name"], last["id"]
+            )
+
+        # Counted from the cached friend set, not with a COUNT(*) per page
+        total = len(await self._get_friend_ids(user_id)) if with_total else None
+
+        return UserPage(
+            users=[UserResponse.model_validate(friend) for friend in db_friends],
+            next_cursor=next_cursor,
+            total=total,
+        )
+
+    async def _get_users_in_order(self, user_ids: list[str]) -> list[dict]:
+        """Fetch users by id, keeping the order of `user_ids`."""
+        if not user_ids:
+            return []
+        db_users = await self.repository.get_users_by_ids(
+            [UUID(user_id) for user_id in user_ids]
+        )
+        users_by_id = {str(user["id"]): user for user in db_users or []}
+        return [users_by_id[user_id] for user_id in user_ids if user_id in users_by_id]
+
+    async def get_mutual_friends(
+        self,
+        user_id: UUID,
+        other_id: UUID,
+        limit: int,
+        cursor: str | None = None,
+    ) -> UserPage:
+        """Common friends in id order, paged by an id cursor."""
+        after_id = str(decode_id_cursor(cursor)) if cursor else None
+        if friend_graph.ready:
+            mutual_ids = friend_graph.mutual_friends(user_id, other_id)
+        else:
+            # Two cached friend sets are cheap to intersect as well
+            mutual_ids = sorted(
+                {str(uid) for uid in await self._get_friend_ids(user_id)}.intersection(
+                    str(uid) for uid in await self._get_friend_ids(other_id)
+                )
+            )
+
+        start = bisect_right(mutual_ids, after_id) if after_id else 0
+
+        page_ids = mutual_ids[start : start + limit]
+        has_more = start + limit < len(mutual_ids)
+
+        return UserPage(
+            users=[
+                UserResponse.model_validate(user)
+                for user in await self._get_users_in_order(page_ids)
+            ],
+            next_cursor=(
+                encode_id_cursor(page_ids[-1]) if has_more and page_ids else None
+            ),
+            total=len(mutual_ids),
+        )
+
+    async def get_friend_suggestions(
+        self, user_id: UUID, limit: int
+    ) -> list[FriendSuggestion]:
+        """People you may know: friends of friends, most mutual friends first.
+
+        Served only from the friend graph (FRIEND_GRAPH_ENABLED): without it
+        the endpoint answers 503 rather than run a friends-of-friends self-join
+        per request.
+        """
+        if not friend_graph.ready:
+            raise AppError(
+                strings.SERVICE_UNAVAILABLE_ERROR_MSG,
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        candidates = dict(friend_graph.suggestions(user_id, limit))
+        users = await self._get_users_in_order(list(candidates))
+        return [
+            FriendSuggestion(
+                **UserResponse.model_validate(user).model_dump(),
+                mutual_friends=candidates[str(user["id"])],
+            )
+            for user in users
+        ]
 
     async def create_post(self, post_data: PostCreate, user_id: UUID) -> UUID | None:
-        from app.core.rabbitmq_client import rabbitmq_client
-        
-        user = await self.repository.get_by_id_with_raw_sql(user_id)
+        user = await self._get_user(user_id)
         if not user:
             raise AppError(strings.NOT_FOUND_USER_ERROR_MSG, status.HTTP_404_NOT_FOUND)
 
-        post_id = await self.repository.create_post(post_data, user_id)
-        await self._invalidate_friends_cache(user_id)
-        
+        post = await self.repository.create_post(post_data, user_id)
+        # Written through before any feed references it; also replaces a
+        # not-found entry cached by a reader that raced the insert
+        await self.cache.write_post(post, post["created_at"])
+        friend_ids = await self._get_friend_ids(user_id)
+
+        if not friend_ids:
+            return post["id"]
+
+        post_message = {
+            "postId": str(post["id"]),
+            "postText": post_data.text,
+            "author_user_id": str(user_id)
+        }
+
+        if len(friend_ids) >= settings.FEED_HIGH_DEGREE_THRESHOLD:
+            # Pull model: one timeline write, readers merge it into their feeds
+            await self.cache.push_post_to_timeline(user_id, post)
+
+            # Publish to RabbitMQ outside of the HTTP request
+            _run_in_background(_publish_post_events(friend_ids, post_message))
+            return post["id"]
+
+        # Feeds merged the author's timeline so far, rebuild them without it
+        if await self.cache.remove_high_degree_author(user_id):
+            await self.cache.bump_author_generation(user_id)
+
+        # Fan-out on write: prepend the post to friends' cached feeds
+        if settings.FEED_FANOUT_ENABLED:
+            await self.cache.push_post_to_feeds(friend_ids, post)
+        else:
+            await self.cache.bump_author_generation(user_id)
+
         # Publish to RabbitMQ for deferred processing
-        friend_ids = await self.repository.get_friend_ids(user_id)
-        if friend_ids:
-            post_message = {
-                "postId": str(post_id),
-                "postText": post_data.text,
-                "author_user_id": str(user_id)
-            }
-            for friend_id in friend_ids:
-                await rabbitmq_client.publish_post_event(str(friend_id), post_message)
-        
-        return post_id
+        await _publish_post_events(friend_ids, post_message)
+
+        return post["id"]
+
+    async def _get_post(self, post_id: UUID) -> dict | None:
+        """Post from the cache, read through to the DB on a miss.
+
+        Deleted and unknown posts are cached as well, so neither hits nor
+        404s reach the replicas while cached.
+        """
+        post = await self.cache.get_post_from_cache(post_id)
+        if post is MISSING:
+            post = await self.repository.get_post_by_id(post_id)
+            if post:
+                await self.cache.set_posts_to_cache([post])
+            else:
+                await self.cache.set_post_not_found([post_id])
+        return post
 
     async def update_post(self, post_data: PostUpdate, user_id: UUID):
-        post = await self.repository.get_post_by_id(post_data.id)
+        post = await self._get_post(post_data.id)
 
         if not post:
             raise AppError(strings.NOT_FOUND_POST_ERROR_MSG, status.HTTP_404_NOT_FOUND)
@@ -118,11 +512,17 @@ class UserService:
         if str(post["author_user_id"]) != user_id:
             raise AppError(strings.NOT_OWNER_POST_ERROR_MSG, status.HTTP_403_FORBIDDEN)
 
-        await self.repository.update_post(post_data)
-        await self._invalidate_friends_cache(user_id)
+        updated_post = await self.repository.update_post(post_data)
+        if not updated_post:
+            # Deleted since it was read, the tombstone must stay in the cache
+            raise AppError(strings.NOT_FOUND_POST_ERROR_MSG, status.HTTP_404_NOT_FOUND)
+
+        # Feeds only reference the post, replace the shared body in place
+        updated_at = updated_post.pop("updated_at")
+        await self.cache.write_post(updated_post, updated_at)
 
     async def delete_post(self, post_id: UUID, user_id: UUID):
-        post = await self.repository.get_post_by_id(post_id)
+        post = await self._get_post(post_id)
 
         if not post:
             raise AppError(strings.NOT_FOUND_POST_ERROR_MSG, status.HTTP_404_NOT_FOUND)
@@ -130,55 +530,252 @@ class UserService:
         if str(post["author_user_id"]) != user_id:
             raise AppError(strings.NOT_OWNER_POST_ERROR_MSG, status.HTTP_403_FORBIDDEN)
 
-        await self.repository.delete_post(post_id)
-        await self._invalidate_friends_cache(user_id)
+        deleted_at = await self.repository.delete_post(post_id)
+        if not deleted_at:
+            return
+
+        # Feed entries of the post are dropped lazily when readers hit the tombstone
+        await self.cache.tombstone_post(post_id, deleted_at)
+        await self.cache.remove_from_timeline(
+            user_id, CacheService.post_feed_entry(post)
+        )
 
     async def get_post(self, post_id: UUID) -> PostResponse | None:
-        post = await self.repository.get_post_by_id(post_id)
+        post = await self._get_post(post_id)
 
         if post:
             return PostResponse.model_validate(post)
 
         return None
 
-    async def get_posts_feed(
-        self, user_id: UUID, offset: int, limit: int
-    ) -> list[PostResponse] | None:
-        cached_posts = await self.cache.get_feed_from_cache(user_id, offset, limit)
+    async def _get_followed_high_degree_authors(self, user_id: UUID) -> list[UUID]:
+        author_ids = await self.cache.get_followed_high_degree_authors(user_id)
+        if author_ids is None:
+            await self._load_friend_ids(user_id)
+            author_ids = await self.cache.get_followed_high_degree_authors(user_id)
+        return author_ids or []
+
+    async def _get_merged_feed_from_cache(
+        self,
+        user_id: UUID,
+        author_ids: list[UUID],
+        offset: int,
+        limit: int,
+        after: tuple[datetime, UUID] | None,
+    ) -> CachedFeed | None:
+        """Merge the pushed feed with timelines of followed high-degree authors."""
+        if after is not None:
+            offset = 0
+        window = offset + limit
+        cached_feed = await self.cache.get_feed_from_cache(user_id, 0, window, after)
+        if cached_feed is None:
+            return None
+
+        timeline_entries = await self.cache.get_timelines(author_ids, window, after)
+        if timeline_entries is None:
+            return None
+
+        # Entries can be in both lists if the feed was rebuilt from DB after
+        # posting; they sort newest first as plain strings
+        merged = sorted(set(cached_feed.entries + timeline_entries), reverse=True)
+        return cached_feed._replace(entries=merged[offset:window])
+
+    async def _hydrate_feed_entries(
+        self, user_id: UUID, entries: list[str]
+    ) -> list[dict]:
+        """Resolve feed entries to posts: post cache first, then one DB query."""
+        post_ids = [CacheService.entry_post_id(entry) for entry in entries]
+        posts = await self.cache.get_posts_from_cache(post_ids)
+
+        missing_ids = [post_id for post_id in post_ids if post_id not in posts]
+        if missing_ids:
+            db_posts = (
+                await self.repository.get_posts_by_ids(
+                    [UUID(post_id) for post_id in missing_ids]
+                )
+                or []
+            )
+            await self.cache.set_posts_to_cache(db_posts)
+            posts.update({str(post["id"]): post for post in db_posts})
+
+            not_found_ids = [post_id for post_id in missing_ids if post_id not in posts]
+            if not_found_ids:
+                await self.cache.set_post_not_found(not_found_ids)
+
+        # Deleted posts: drop their entries so the next read skips them
+        stale_entries = [
+            entry
+            for entry in entries
+            if posts.get(CacheService.entry_post_id(entry)) is None
+        ]
+        if stale_entries:
+            await self.cache.remove_feed_entries(user_id, stale_entries)
+
+        return [posts[post_id] for post_id in post_ids if posts.get(post_id)]
+
+    async def _load_feed_single_flight(self, user_id: UUID) -> list[dict] | None:
+        """Rebuild the cached feed once per process, waiters share the result."""
+        return await _feed_rebuilds.do(
+            str(user_id), lambda: self._rebuild_feed_once(user_id)
+        )
 
-        if cached_posts is not None:
+    async def _rebuild_feed_once(self, user_id: UUID) -> list[dict] | None:
+        """Rebuild the feed under a Redis lock shared by all instances.
+
+        Returns the rebuilt posts, or None if another instance rebuilt the
+        cached feed in the meantime.
+        """
+        lock_name = f"feed:{user_id}"
+        token = await self.cache.acquire_lock(
+            lock_name, settings.FEED_REBUILD_LOCK_TTL
+        )
+
+        if token is None:
+            # Another instance is rebuilding - wait for its result
+            deadline = time.monotonic() + settings.FEED_REBUILD_WAIT
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                if await self.cache.feed_exists(user_id):
+                    return None
+                if not await self.cache.lock_exists(lock_name):
+                    # Released without a cached feed (e.g. a Redis error)
+                    break
+            else:
+                logger.warning(f"Feed rebuild wait timed out for user {user_id}")
+
+        try:
+            started = time.monotonic()
+            generation = await self.cache.get_feed_generation()
+            friend_ids = await self._get_friend_ids(user_id)
+            async with db_manager.read_session() as session:
+                db_posts = await UserRepository(session).get_posts_feed(
+                    user_id, 0, settings.FEED_CACHE_SIZE
+                )
+            db_posts = db_posts or []
+
+            # Only the lock holder writes the cache
+            if token is not None:
+                await self.cache.set_feed_to_cache(
+                    user_id,
+                    db_posts,
+                    generation,
+                    friend_ids,
+                    time.monotonic() - started,
+                )
+            return db_posts
+        finally:
+            if token is not None:
+                await self.cache.release_lock(lock_name, token)
+
+    def _maybe_refresh_feed_early(self, user_id: UUID, cached_feed: CachedFeed):
+        """Probabilistic early expiration (XFetch) for hot feeds.
+
+        The closer the feed is to its TTL and the longer it takes to rebuild,
+        the more likely a read is to refresh it in the background, so hot feeds
+        are rebuilt by one request before they expire for everyone.
+        """
+        if cached_feed.ttl < 0 or _feed_rebuilds.in_flight(str(user_id)):
+            return
+
+        gap = -cached_feed.rebuild_cost * settings.FEED_EARLY_REFRESH_BETA * math.log(
+            1.0 - random.random()
+        )
+        if cached_feed.ttl <= gap:
+            logger.info(f"Early feed refresh for user {user_id}")
+            _run_in_background(self._load_feed_single_flight(user_id))
+
+    async def _get_cached_feed(
+        self,
+        user_id: UUID,
+        offset: int,
+        limit: int,
+        after: tuple[datetime, UUID] | None,
+    ) -> CachedFeed | None:
+        high_degree_author_ids = await self._get_followed_high_degree_authors(user_id)
+
+        if high_degree_author_ids:
+            return await self._get_merged_feed_from_cache(
+                user_id, high_degree_author_ids, offset, limit, after
+            )
+        return await self.cache.get_feed_from_cache(user_id, offset, limit, after)
+
+    async def _get_feed_posts(
+        self,
+        user_id: UUID,
+        offset: int,
+        limit: int,
+        after: tuple[datetime, UUID] | None,
+    ) -> tuple[list[dict], str | None]:
+        """Return a feed page and the cursor of the page that follows it."""
+        cached_feed = await self._get_cached_feed(user_id, offset, limit, after)
+
+        if cached_feed is not None:
             logger.info(f"Feed from cache for user {user_id}")
-            return [PostResponse.model_validate(post) for post in cached_posts]
+            self._maybe_refresh_feed_early(user_id, cached_feed)
+
+            entries = cached_feed.entries
+            next_cursor = (
+                CacheService.entry_cursor(entries[-1]) if len(entries) == limit else None
+            )
+            return await self._hydrate_feed_entries(user_id, entries), next_cursor
 
         logger.info(f"Feed from DB for user {user_id}")
 
+        # Cache miss on a keyset page - seek directly by (created_at, id)
+        if after is not None:
+            db_posts = await self.repository.get_posts_feed_after(
+                user_id, after[0], after[1], limit
+            )
+
         # Cache miss on first page
-        if offset == 0:
+        elif offset == 0:
             # Load enough data to satisfy request and populate cache
-            load_limit = max(limit, settings.FEED_CACHE_SIZE)
-            db_posts = await self.repository.get_posts_feed(user_id, 0, load_limit)
+            db_posts = await self._load_feed_single_flight(user_id)
 
-            if db_posts:
-                # Cache first 1000 posts
-                await self.cache.set_feed_to_cache(
-                    user_id, db_posts[: settings.FEED_CACHE_SIZE]
-                )
-                # Return requested amount
-                return [PostResponse.model_validate(post) for post in db_posts[:limit]]
-            return []
+            if db_posts is None:
+                # Rebuilt by another instance
+                cached_feed = await self.cache.get_feed_from_cache(user_id, 0, limit)
+                if cached_feed is not None:
+                    db_posts = await self._hydrate_feed_entries(
+                        user_id, cached_feed.entries
+                    )
+
+            if db_posts is None or limit > len(db_posts) >= settings.FEED_CACHE_SIZE:
+                db_posts = await self.repository.get_posts_feed(user_id, 0, limit)
+
+            # Return requested amount
+            db_posts = (db_posts or [])[:limit]
 
         # Cache miss on other pages - query DB directly
-        db_posts = await self.repository.get_posts_feed(user_id, offset, limit)
-        return (
-            [PostResponse.model_validate(post) for post in db_posts] if db_posts else []
+        else:
+            db_posts = await self.repository.get_posts_feed(user_id, offset, limit)
+
+        db_posts = db_posts or []
+        next_cursor = None
+        if len(db_posts) == limit:
+            next_cursor = encode_cursor(db_posts[-1]["created_at"], db_posts[-1]["id"])
+        return db_posts, next_cursor
+
+    async def get_posts_feed(
+        self, user_id: UUID, offset: int, limit: int, cursor: str | None = None
+    ) -> FeedPage:
+        after = decode_cursor(cursor) if cursor else None
+        posts, next_cursor = await self._get_feed_posts(user_id, offset, limit, after)
+
+        return FeedPage(
+            posts=[PostResponse.model_validate(post) for post in posts],
+            next_cursor=next_cursor,
         )
 
     async def rebuild_feed_cache(self, user_id: UUID):
         await self.cache.invalidate_feeds([user_id])
+        generation = await self.cache.get_feed_generation()
+        friend_ids = await self._get_friend_ids(user_id)
         db_posts = await self.repository.get_posts_feed(
             user_id, 0, settings.FEED_CACHE_SIZE
         )
-        if db_posts:
-            await self.cache.set_feed_to_cache(user_id, db_posts)
+        await self.cache.set_feed_to_cache(
+            user_id, db_posts or [], generation, friend_ids
+        )
         logger.info(f"Cache rebuilt for user {user_id}")
         return True
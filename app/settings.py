@@ -1,5 +1,6 @@
 """Application settings."""
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -28,6 +29,12 @@ class AppSettings(BaseSettings):
     JWT_SECRET_KEY: str
     JWT_EXPIRATION_TIME: int = 3600
     JWT_ALGORITHM: str
+    # Verified token payloads kept in memory, 0 disables the cache
+    JWT_CACHE_MAX_SIZE: int = 10000
+
+    # Password hashing (bcrypt) worker processes
+    PASSWORD_POOL_WORKERS: int = 2
+    PASSWORD_POOL_MAX_PENDING: int = 64
 
     @property
     def DATABASE_URL(self) -> str:
@@ -58,6 +65,42 @@ class AppSettings(BaseSettings):
     REDIS_PASSWORD: str | None = None
     FEED_CACHE_SIZE: int = 1000
     FEED_CACHE_TTL: int = 3600
+    POST_CACHE_TTL: int = 3600
+    POST_NOT_FOUND_CACHE_TTL: int = 60
+    FEED_FANOUT_ENABLED: bool = True
+    FEED_FANOUT_BATCH_SIZE: int = 500
+    FEED_HIGH_DEGREE_THRESHOLD: int = 10000
+    FEED_REBUILD_LOCK_TTL: int = 10
+    FEED_REBUILD_WAIT: float = 2.0
+    FEED_EARLY_REFRESH_BETA: float = 1.0
+    FEED_AUTHOR_GENS_LOG_SIZE: int = 10000
+    FRIENDS_CACHE_TTL: int = 3600
+    USER_CACHE_TTL: int = 3600
+    USER_NOT_FOUND_CACHE_TTL: int = 60
+    SEARCH_CACHE_TTL: int = 30
+    SEARCH_MAX_PAGE_SIZE: int = 100
+    SEARCH_INDEX_ENABLED: bool = False
+    SEARCH_INDEX_LOAD_BATCH_SIZE: int = 10000
+    FRIENDS_MAX_PAGE_SIZE: int = 500
+    FRIENDS_BULK_MAX_SIZE: int = 1000
+    FRIEND_GRAPH_ENABLED: bool = False
+    FRIEND_GRAPH_LOAD_BATCH_SIZE: int = 50000
+    FRIEND_GRAPH_MAX_SCANNED_FRIENDS: int = 1000
+
+    # In-process cache tier in front of Redis
+    LOCAL_CACHE_ENABLED: bool = False
+    LOCAL_CACHE_MAX_SIZE: int = 10000
+    LOCAL_CACHE_TTL: float = 5.0
+
+    # Rate limits shared by all instances through Redis, "<requests>/<seconds>"
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_LOGIN_IP: str = "20/60"
+    RATE_LIMIT_LOGIN_USER: str = "5/60"
+    RATE_LIMIT_REGISTER: str = "5/60"
+    RATE_LIMIT_POST_WRITE: str = "30/60"
+    RATE_LIMIT_FRIEND_WRITE: str = "30/60"
+    # Counted in friend ids, the count must be at least FRIENDS_BULK_MAX_SIZE
+    RATE_LIMIT_FRIEND_BULK: str = "2000/3600"
 
     # RabbitMQ
     RABBITMQ_HOST: str = "localhost"
@@ -67,8 +110,32 @@ class AppSettings(BaseSettings):
 
     # Messages Service
     MESSAGES_SERVICE_URL: str = "http://localhost:8001"
+    MESSAGES_MAX_CONNECTIONS: int = 100
+    MESSAGES_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    MESSAGES_KEEPALIVE_EXPIRY: float = 30.0
+    MESSAGES_POOL_TIMEOUT: float = 5.0
+    MESSAGES_TIMEOUT: float = 10.0
+    # Consecutive errors or responses slower than the threshold (seconds)
+    # that open the circuit, and how long it stays open
+    MESSAGES_BREAKER_FAILURE_THRESHOLD: int = 5
+    MESSAGES_BREAKER_SLOW_CALL_THRESHOLD: float = 2.0
+    MESSAGES_BREAKER_OPEN_DURATION: float = 10.0
+    # Repeat slow dialog reads after the p95 latency (not less than min delay)
+    MESSAGES_HEDGE_ENABLED: bool = False
+    MESSAGES_HEDGE_MIN_DELAY: float = 0.05
 
     WEB_PORT: int = 8000
 
+    @model_validator(mode="after")
+    def check_friend_bulk_limit(self) -> "AppSettings":
+        # A bulk request costs one unit per friend id, a limit below the
+        # largest request would reject it however long the client waits
+        count = int(self.RATE_LIMIT_FRIEND_BULK.split("/")[0])
+        if count < self.FRIENDS_BULK_MAX_SIZE:
+            raise ValueError(
+                "RATE_LIMIT_FRIEND_BULK count must be at least FRIENDS_BULK_MAX_SIZE"
+            )
+        return self
+
 
 settings = AppSettings()
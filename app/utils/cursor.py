@@ -0,0 +1,159 @@
+"""Opaque keyset pagination cursors."""
+
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from fastapi import status
+
+from app.core.exceptions import AppError
+from app.resources import strings
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_micros(created_at: datetime | str) -> int:
+    """Exact number of microseconds since the epoch."""
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    return (created_at - _EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def encode_cursor(created_at: datetime | str, item_id: UUID | str) -> str:
+    """
+    Encode a (created_at, id) keyset position into an opaque cursor.
+
+    Args:
+        created_at: Timestamp of the last returned item.
+        item_id: Id of the last returned item.
+
+    Returns:
+        str: Url-safe cursor string.
+    """
+    raw = f"{to_micros(created_at)}:{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Raises:
+        AppError: If the cursor is malformed.
+
+    Returns:
+        tuple: (created_at, id) of the last item of the previous page.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        micros, item_id = base64.urlsafe_b64decode(padded).decode().split(":")
+        return from_micros(int(micros)), UUID(item_id)
+    except (ValueError, UnicodeDecodeError):
+        raise AppError(strings.NOT_VALID_ERROR_MSG, status.HTTP_400_BAD_REQUEST)
+
+
+def encode_name_cursor(
+    first_name: str, second_name: str, user_id: UUID | str
+) -> str:
+    """
+    Encode a (first_name, second_name, id) keyset position of a list of
+    users ordered by name into an opaque cursor.
+
+    Args:
+        first_name: First name (sort key) of the last returned user.
+        second_name: Second name (sort key) of the last returned user.
+        user_id: Id of the last returned user.
+
+    Returns:
+        str: Url-safe cursor string.
+    """
+    raw = json.dumps([first_name, second_name, str(user_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_name_cursor(cursor: str) -> tuple[str, str, UUID]:
+    """
+    Decode a cursor produced by `encode_name_cursor`.
+
+    Raises:
+        AppError: If the cursor is malformed.
+
+    Returns:
+        tuple: (first_name, second_name, id) of the last user of the previous page.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        first_name, second_name, user_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(first_name), str(second_name), UUID(user_id)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise AppError(strings.NOT_VALID_ERROR_MSG, status.HTTP_400_BAD_REQUEST)
+
+
+def encode_rank_cursor(rank: float, item_id: UUID | str) -> str:
+    """
+    Encode a (rank, id) keyset position of a ranked search into an opaque cursor.
+
+    Args:
+        rank: Rank of the last returned item.
+        item_id: Id of the last returned item.
+
+    Returns:
+        str: Url-safe cursor string.
+    """
+    # repr round-trips the float exactly, so the next page starts right after it
+    raw = f"{rank!r}:{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, UUID]:
+    """
+    Decode a cursor produced by `encode_rank_cursor`.
+
+    Raises:
+        AppError: If the cursor is malformed.
+
+    Returns:
+        tuple: (rank, id) of the last item of the previous page.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, item_id = base64.urlsafe_b64decode(padded).decode().split(":")
+        return float(rank), UUID(item_id)
+    except (ValueError, UnicodeDecodeError):
+        raise AppError(strings.NOT_VALID_ERROR_MSG, status.HTTP_400_BAD_REQUEST)
+
+
+def encode_id_cursor(item_id: UUID | str) -> str:
+    """
+    Encode an id keyset position of a list ordered by id into an opaque cursor.
+
+    Args:
+        item_id: Id of the last returned item.
+
+    Returns:
+        str: Url-safe cursor string.
+    """
+    raw = str(item_id).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_id_cursor(cursor: str) -> UUID:
+    """
+    Decode a cursor produced by `encode_id_cursor`.
+
+    Raises:
+        AppError: If the cursor is malformed.
+
+    Returns:
+        UUID: Id of the last item of the previous page.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return UUID(base64.urlsafe_b64decode(padded).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise AppError(strings.NOT_VALID_ERROR_MSG, status.HTTP_400_BAD_REQUEST)
@@ -1,12 +1,23 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.controllers import user_router, auth_router, websocket_router, messages_router
+from app.controllers import (
+    user_router,
+    auth_router,
+    websocket_router,
+    messages_router,
+    metrics_router,
+)
 from app.core.exceptions import AppError
 from fastapi.exceptions import RequestValidationError
 from app.core.db_manager import db_manager
 from app.core.redis_client import redis_client
+from app.core.local_cache import local_cache
 from app.core.rabbitmq_client import rabbitmq_client
+from app.core.messages_client import messages_client
+from app.core.password_pool import password_pool
 from app.services.feed_worker import start_feed_worker
+from app.services.search_index import search_index
+from app.services.friend_graph import friend_graph
 from app.middleware import RequestIDMiddleware
 import asyncio
 
@@ -23,12 +34,19 @@ async def lifespan(app: FastAPI):
     await db_manager.start_health_check()
     await redis_client.connect()
     await rabbitmq_client.connect()
+    await messages_client.connect()
+    password_pool.start()
     asyncio.create_task(start_feed_worker())
+    asyncio.create_task(local_cache.listen_for_invalidations())
+    asyncio.create_task(search_index.run())
+    asyncio.create_task(friend_graph.run())
     yield
     # Shutdown
     await db_manager.close_all()
     await redis_client.close()
     await rabbitmq_client.close()
+    await messages_client.close()
+    password_pool.stop()
 
 
 app = FastAPI(title="Social Network API", version="1.0.0", lifespan=lifespan)
@@ -40,6 +58,7 @@ app.add_middleware(RequestIDMiddleware)
 app.include_router(user_router, prefix="/api/v1")
 app.include_router(auth_router, prefix="/api/v1")
 app.include_router(messages_router, prefix="/api/v1")
+app.include_router(metrics_router, prefix="/api/v1")
 app.include_router(websocket_router)
 
 # Exception handlers
@@ -0,0 +1,25 @@
+import os
+
+# Required settings without defaults, so the app imports without a .env file
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
+os.environ.setdefault("JWT_SECRET_KEY", "test")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+
+import fakeredis
+import pytest_asyncio
+
+from app.core.redis_client import redis_client
+
+
+@pytest_asyncio.fixture
+async def redis():
+    """In-memory Redis (with Lua scripting) behind the app's redis_client."""
+    client = fakeredis.FakeAsyncRedis(
+        server=fakeredis.FakeServer(), decode_responses=True
+    )
+    redis_client.client = client
+    redis_client._scripts.clear()
+    yield client
+    redis_client.client = None
+    redis_client._scripts.clear()
+    await client.aclose()
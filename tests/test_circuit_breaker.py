@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.core.exceptions import AppError
+
+
+def make_breaker(**kwargs) -> CircuitBreaker:
+    options = {
+        "failure_threshold": 3,
+        "slow_call_threshold": 1.0,
+        "open_duration": 0.05,
+        **kwargs,
+    }
+    return CircuitBreaker("test", **options)
+
+
+def fail(breaker: CircuitBreaker, times: int):
+    for _ in range(times):
+        breaker.before_call()
+        breaker.record(False, 0.01)
+
+
+def test_opens_after_consecutive_failures():
+    breaker = make_breaker()
+    fail(breaker, 2)
+    breaker.before_call()
+    breaker.record(True, 0.01)
+    fail(breaker, 2)
+    assert breaker.state == CLOSED
+
+    fail(breaker, 1)
+    assert breaker.state == OPEN
+
+    with pytest.raises(AppError) as error:
+        breaker.before_call()
+    assert error.value.status_code == 503
+    assert error.value.headers["Retry-After"] == "1"
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_slow_calls_count_as_failures():
+    breaker = make_breaker(slow_call_threshold=0.5)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record(True, 0.6)
+
+    assert breaker.state == OPEN
+
+
+def test_half_open_probe_closes_the_circuit():
+    breaker = make_breaker()
+    fail(breaker, 3)
+    time.sleep(0.06)
+
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time
+    with pytest.raises(AppError):
+        breaker.before_call()
+
+    breaker.record(True, 0.01)
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_failed_probe_opens_the_circuit_again():
+    breaker = make_breaker()
+    fail(breaker, 3)
+    time.sleep(0.06)
+
+    fail(breaker, 1)
+
+    assert breaker.state == OPEN
+    assert breaker.stats()["opened"] == 2
+    with pytest.raises(AppError):
+        breaker.before_call()
+
+
+def test_abandoned_probe_frees_the_slot():
+    breaker = make_breaker()
+    fail(breaker, 3)
+    time.sleep(0.06)
+
+    breaker.before_call()
+    breaker.release()
+
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
@@ -0,0 +1,105 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from app.core.exceptions import AppError
+from app.utils.cursor import (
+    decode_cursor,
+    decode_id_cursor,
+    decode_name_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_id_cursor,
+    encode_name_cursor,
+    encode_rank_cursor,
+)
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    item_id = uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, item_id)) == (created_at, item_id)
+    # Timestamps serialized by the cache come back as strings
+    assert decode_cursor(encode_cursor(created_at.isoformat(), str(item_id))) == (
+        created_at,
+        item_id,
+    )
+
+
+def test_name_cursor_round_trip():
+    user_id = uuid4()
+    # Separators and non-ASCII names survive the JSON encoding
+    cursor = encode_name_cursor("анна:мария", "o'neil", user_id)
+
+    assert decode_name_cursor(cursor) == ("анна:мария", "o'neil", user_id)
+
+
+def test_rank_cursor_round_trip_is_exact():
+    item_id = uuid4()
+    rank = 0.1 + 0.2
+
+    assert decode_rank_cursor(encode_rank_cursor(rank, item_id)) == (rank, item_id)
+
+
+def test_id_cursor_round_trip():
+    item_id = uuid4()
+
+    assert decode_id_cursor(encode_id_cursor(item_id)) == item_id
+    # A raw id is not a cursor
+    with pytest.raises(AppError):
+        decode_id_cursor(str(item_id))
+
+
+@pytest.mark.parametrize(
+    "decode",
+    [decode_cursor, decode_id_cursor, decode_name_cursor, decode_rank_cursor],
+)
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "not a cursor!",
+        "MTIzNDU",  # "12345"
+        "MTIzOm5vdC1hLXV1aWQ",  # "123:not-a-uuid"
+        "WyJhIiwgImIiXQ",  # '["a", "b"]'
+        "__8",  # invalid UTF-8
+    ],
+)
+def test_malformed_cursor_is_rejected(decode, cursor):
+    with pytest.raises(AppError) as error:
+        decode(cursor)
+
+    assert error.value.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/api/v1/user/post/feed?cursor=bad",
+        "/api/v1/user/search?first_name=an&second_name=iv&cursor=bad",
+        "/api/v1/user/search/name?query=ivan&cursor=bad",
+        "/api/v1/user/search/biography?query=music&cursor=bad",
+        "/api/v1/user/post/search?query=music&cursor=bad",
+        "/api/v1/user/friends?cursor=bad",
+        f"/api/v1/user/friends/mutual/{uuid4()}?cursor=bad",
+    ],
+)
+async def test_malformed_cursor_returns_400(redis, url):
+    from app.core.dependencies import get_current_user, get_read_db
+    from main import app
+
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": str(uuid4())}
+    app.dependency_overrides[get_read_db] = lambda: None
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get(url)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 400
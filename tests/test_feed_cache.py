@@ -0,0 +1,269 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.services.cache_service import CacheService
+from app.settings import settings
+from app.utils.cursor import decode_cursor
+
+
+def make_posts(author_id, count: int) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid4()),
+            "text": f"post {i}",
+            "author_user_id": str(author_id),
+            "created_at": now - timedelta(minutes=i),
+        }
+        for i in range(count)
+    ]
+
+
+async def cache_feed(
+    cache: CacheService, user_id, posts, author_ids, rebuild_cost=0.0
+):
+    generation = await cache.get_feed_generation()
+    assert await cache.set_feed_to_cache(
+        user_id, posts, generation, author_ids, rebuild_cost
+    )
+
+
+def entries(posts: list[dict]) -> list[str]:
+    return [CacheService.post_feed_entry(post) for post in posts]
+
+
+@pytest.mark.asyncio
+async def test_feed_page_reads_cached_entries(redis):
+    cache = CacheService()
+    user_id, author_id = uuid4(), uuid4()
+    posts = make_posts(author_id, 5)
+    await cache_feed(cache, user_id, posts, [author_id], rebuild_cost=0.25)
+
+    page = await cache.get_feed_from_cache(user_id, 1, 2)
+
+    assert page.entries == entries(posts[1:3])
+    assert page.ttl > 0
+    assert page.rebuild_cost == 0.25
+
+
+@pytest.mark.asyncio
+async def test_feed_page_after_keyset_position(redis):
+    cache = CacheService()
+    user_id, author_id = uuid4(), uuid4()
+    posts = make_posts(author_id, 5)
+    await cache_feed(cache, user_id, posts, [author_id])
+
+    after = (posts[1]["created_at"], posts[1]["id"])
+    page = await cache.get_feed_from_cache(user_id, 0, 10, after)
+
+    assert page.entries == entries(posts[2:])
+
+
+@pytest.mark.asyncio
+async def test_short_feed_is_complete(redis):
+    cache = CacheService()
+    user_id, author_id = uuid4(), uuid4()
+    posts = make_posts(author_id, 3)
+    await cache_feed(cache, user_id, posts, [author_id])
+
+    # Fewer posts than FEED_CACHE_SIZE is the whole feed, no DB fall-through
+    page = await cache.get_feed_from_cache(user_id, 2, 5)
+    assert page.entries == entries(posts[2:])
+    page = await cache.get_feed_from_cache(user_id, 10, 5)
+    assert page.entries == []
+
+
+@pytest.mark.asyncio
+async def test_page_past_end_of_full_feed_goes_to_db(redis, monkeypatch):
+    monkeypatch.setattr(settings, "FEED_CACHE_SIZE", 5)
+    cache = CacheService()
+    user_id, author_id = uuid4(), uuid4()
+    posts = make_posts(author_id, 5)
+    await cache_feed(cache, user_id, posts, [author_id])
+
+    assert (await cache.get_feed_from_cache(user_id, 0, 5)).entries == entries(posts)
+    assert await cache.get_feed_from_cache(user_id, 3, 5) is None
+    after = (posts[3]["created_at"], posts[3]["id"])
+    assert await cache.get_feed_from_cache(user_id, 0, 5, after) is None
+
+
+@pytest.mark.asyncio
+async def test_full_feed_stays_incomplete_after_removals(redis, monkeypatch):
+    monkeypatch.setattr(settings, "FEED_CACHE_SIZE", 10)
+    cache = CacheService()
+    user_id, author_id = uuid4(), uuid4()
+    posts = make_posts(author_id, 10)
+    await cache_feed(cache, user_id, posts, [author_id])
+
+    await cache.remove_feed_entries(user_id, entries(posts[4:5]))
+
+    # Nine entries left, but older posts exist beyond them in the DB
+    assert await cache.get_feed_from_cache(user_id, 9, 5) is None
+    after = (posts[-1]["created_at"], posts[-1]["id"])
+    assert await cache.get_feed_from_cache(user_id, 0, 5, after) is None
+    page = await cache.get_feed_from_cache(user_id, 3, 5)
+    assert page.entries == entries(posts[3:4] + posts[5:9])
+
+
+@pytest.mark.asyncio
+async def test_feed_filled_by_pushes_is_no_longer_complete(redis, monkeypatch):
+    monkeypatch.setattr(settings, "FEED_CACHE_SIZE", 3)
+    cache = CacheService()
+    user_id, author_id = uuid4(), uuid4()
+    posts = make_posts(author_id, 3)
+    await cache_feed(cache, user_id, posts[1:], [author_id])
+    assert (await cache.get_feed_from_cache(user_id, 2, 5)).entries == []
+
+    await cache.push_post_to_feeds([user_id], posts[0])
+
+    # LTRIM cut the marker off: the oldest post may have older neighbours
+    assert await cache.get_feed_from_cache(user_id, 2, 5) is None
+    page = await cache.get_feed_from_cache(user_id, 0, 3)
+    assert page.entries == entries(posts)
+
+
+def test_feed_entries_sort_like_keyset_positions():
+    posts = make_posts(uuid4(), 3)
+    # Same timestamp, ordered by id
+    posts.append({**posts[0], "id": "ffffffff-ffff-ffff-ffff-ffffffffffff"})
+
+    ordered = sorted(
+        posts, key=lambda post: (post["created_at"], post["id"]), reverse=True
+    )
+
+    assert entries(ordered) == sorted(entries(posts), reverse=True)
+    entry = CacheService.post_feed_entry(posts[1])
+    assert CacheService.entry_post_id(entry) == posts[1]["id"]
+    assert decode_cursor(CacheService.entry_cursor(entry)) == (
+        posts[1]["created_at"],
+        UUID(posts[1]["id"]),
+    )
+
+
+@pytest.mark.asyncio
+async def test_feed_stores_post_bodies_once(redis):
+    cache = CacheService()
+    author_id = uuid4()
+    posts = make_posts(author_id, 2)
+    await cache_feed(cache, uuid4(), posts, [author_id])
+    await cache_feed(cache, uuid4(), posts, [author_id])
+
+    cached = await cache.get_posts_from_cache([posts[0]["id"], str(uuid4())])
+
+    assert list(cached) == [posts[0]["id"]]
+    assert cached[posts[0]["id"]]["text"] == "post 0"
+    assert len(await redis.keys("post:*")) == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_feed_goes_to_db(redis):
+    assert await CacheService().get_feed_from_cache(uuid4(), 0, 10) is None
+
+
+@pytest.mark.asyncio
+async def test_bumping_a_feed_author_invalidates_the_feed(redis):
+    cache = CacheService()
+    user_id, author_id, other_id = uuid4(), uuid4(), uuid4()
+    await cache_feed(cache, user_id, make_posts(author_id, 3), [author_id])
+
+    # Authors the feed was not built from leave it alone
+    await cache.bump_author_generation(other_id)
+    assert await cache.get_feed_from_cache(user_id, 0, 10) is not None
+
+    await cache.bump_author_generation(author_id)
+    assert await cache.get_feed_from_cache(user_id, 0, 10) is None
+    assert not await cache.feed_exists(user_id)
+
+
+@pytest.mark.asyncio
+async def test_bump_before_build_does_not_invalidate(redis):
+    cache = CacheService()
+    user_id, author_id = uuid4(), uuid4()
+    await cache.bump_author_generation(author_id)
+
+    await cache_feed(cache, user_id, make_posts(author_id, 3), [author_id])
+
+    assert await cache.get_feed_from_cache(user_id, 0, 10) is not None
+
+
+@pytest.mark.asyncio
+async def test_bump_during_build_invalidates(redis):
+    cache = CacheService()
+    user_id, author_id = uuid4(), uuid4()
+    # The feed is loaded from the DB at this generation...
+    generation = await cache.get_feed_generation()
+    # ...while the author posts
+    await cache.bump_author_generation(author_id)
+
+    posts = make_posts(author_id, 3)
+    await cache.set_feed_to_cache(user_id, posts, generation, [author_id])
+
+    assert await cache.get_feed_from_cache(user_id, 0, 10) is None
+
+
+@pytest.mark.asyncio
+async def test_feed_is_stale_when_author_log_was_truncated(redis, monkeypatch):
+    monkeypatch.setattr(settings, "FEED_AUTHOR_GENS_LOG_SIZE", 3)
+    cache = CacheService()
+    user_id, author_id = uuid4(), uuid4()
+    await cache_feed(cache, user_id, make_posts(author_id, 3), [author_id])
+
+    # The log no longer reaches back to the feed's generation, so a bump of
+    # one of its authors may have been dropped
+    for _ in range(5):
+        await cache.bump_author_generation(uuid4())
+
+    assert await cache.get_feed_from_cache(user_id, 0, 10) is None
+
+
+@pytest.mark.asyncio
+async def test_empty_feed_is_cached(redis):
+    cache = CacheService()
+    user_id, author_id = uuid4(), uuid4()
+    await cache_feed(cache, user_id, [], [author_id])
+
+    page = await cache.get_feed_from_cache(user_id, 0, 10)
+    assert page is not None
+    assert page.entries == []
+
+    # Posts pushed later go in front of the complete-feed marker
+    post = make_posts(author_id, 1)[0]
+    await cache.push_post_to_feeds([user_id], post)
+
+    page = await cache.get_feed_from_cache(user_id, 0, 10)
+    assert page.entries == [CacheService.post_feed_entry(post)]
+    after = (post["created_at"], post["id"])
+    assert (await cache.get_feed_from_cache(user_id, 0, 10, after)).entries == []
+
+
+@pytest.mark.asyncio
+async def test_followed_high_degree_authors(redis):
+    cache = CacheService()
+    user_id, followed, other, friend = uuid4(), uuid4(), uuid4(), uuid4()
+    for author_id in (followed, other):
+        await cache.push_post_to_timeline(author_id, make_posts(author_id, 1)[0])
+
+    # Unknown until the friend set is loaded
+    assert await cache.get_followed_high_degree_authors(user_id) is None
+    await cache.set_friend_ids(user_id, [followed, friend])
+
+    assert await cache.get_followed_high_degree_authors(user_id) == [followed]
+
+
+@pytest.mark.asyncio
+async def test_timelines_expire_and_leave_with_their_author(redis):
+    cache = CacheService()
+    author_id = uuid4()
+    await cache.push_post_to_timeline(author_id, make_posts(author_id, 1)[0])
+    key = CacheService._get_timeline_key(author_id)
+
+    assert 0 < await redis.ttl(key) <= settings.FEED_CACHE_TTL
+
+    assert await cache.remove_high_degree_author(author_id)
+    assert not await redis.exists(key)
+    high_degree_authors = await redis.smembers(CacheService.HIGH_DEGREE_AUTHORS_KEY)
+    assert str(author_id) not in high_degree_authors
+    # Only the first removal asks for feeds to be invalidated
+    assert not await cache.remove_high_degree_author(author_id)
@@ -0,0 +1,59 @@
+from uuid import uuid4
+
+import pytest
+
+from app.services.cache_service import CacheService
+
+
+@pytest.mark.asyncio
+async def test_friend_set_round_trip(redis):
+    cache = CacheService()
+    user_id, friend_id = uuid4(), uuid4()
+
+    assert await cache.get_friend_ids(user_id) is None
+    await cache.set_friend_ids(user_id, [friend_id])
+
+    assert await cache.get_friend_ids(user_id) == [friend_id]
+
+
+@pytest.mark.asyncio
+async def test_empty_friend_list_is_cached(redis):
+    cache = CacheService()
+    user_id = uuid4()
+
+    await cache.set_friend_ids(user_id, [])
+
+    assert await cache.get_friend_ids(user_id) == []
+    assert await cache.get_friend_ids_among(user_id, [uuid4()]) == []
+
+
+@pytest.mark.asyncio
+async def test_friend_ids_among(redis):
+    cache = CacheService()
+    user_id, friend_id, stranger_id = uuid4(), uuid4(), uuid4()
+
+    assert await cache.get_friend_ids_among(user_id, [friend_id]) is None
+    await cache.set_friend_ids(user_id, [friend_id])
+
+    assert await cache.get_friend_ids_among(user_id, [stranger_id, friend_id]) == [
+        friend_id
+    ]
+
+
+@pytest.mark.asyncio
+async def test_write_through_updates_only_cached_sets(redis):
+    cache = CacheService()
+    user_id, friend_id, other_id = uuid4(), uuid4(), uuid4()
+    await cache.set_friend_ids(user_id, [other_id])
+
+    await cache.add_friendship(user_id, friend_id)
+
+    assert set(await cache.get_friend_ids(user_id)) == {other_id, friend_id}
+    # The friend's set was never loaded: write-through alone must not create
+    # a set that would read as a complete friend list
+    assert await cache.get_friend_ids(friend_id) is None
+    assert not await redis.exists(CacheService._get_friends_key(friend_id))
+
+    await cache.remove_friendship(friend_id, user_id)
+
+    assert await cache.get_friend_ids(user_id) == [other_id]
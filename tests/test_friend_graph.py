@@ -0,0 +1,86 @@
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.core.exceptions import AppError
+from app.services.friend_graph import FriendGraph, friend_graph
+from app.services.user_service import UserService
+from app.settings import settings
+
+
+def make_graph(*friendships) -> FriendGraph:
+    graph = FriendGraph(enabled=True)
+    for user_id, friend_id in friendships:
+        graph.add_friendship(user_id, friend_id)
+    return graph
+
+
+def test_mutual_friends_in_id_order():
+    graph = make_graph(
+        ("me", "c"), ("me", "a"), ("me", "b"),
+        ("other", "b"), ("other", "c"), ("other", "d"),
+    )
+
+    assert graph.mutual_friends("me", "other") == ["b", "c"]
+    assert graph.mutual_friends("me", "unknown") == []
+
+
+def test_ids_of_any_type_map_to_one_node():
+    user_id = UUID("00000000-0000-0000-0000-000000000001")
+    graph = make_graph((user_id, "a"), (str(user_id), "b"), ("other", "a"))
+
+    assert graph.mutual_friends(str(user_id), "other") == ["a"]
+    assert graph.stats()["users"] == 4
+
+
+def test_suggestions_ranked_by_mutual_friends():
+    graph = make_graph(
+        ("me", "a"), ("me", "b"), ("me", "c"),
+        ("a", "x"), ("b", "x"), ("c", "x"),
+        ("a", "y"), ("b", "y"),
+        ("c", "z"),
+        # Friends of friends who are already friends are not suggested
+        ("a", "b"),
+    )
+
+    assert graph.suggestions("me", 10) == [("x", 3), ("y", 2), ("z", 1)]
+    assert graph.suggestions("me", 2) == [("x", 3), ("y", 2)]
+    assert graph.suggestions("unknown", 10) == []
+
+
+def test_suggestions_scan_a_bounded_number_of_friends(monkeypatch):
+    monkeypatch.setattr(settings, "FRIEND_GRAPH_MAX_SCANNED_FRIENDS", 1)
+    graph = make_graph(("me", "a"), ("me", "b"), ("a", "x"), ("b", "y"))
+
+    assert graph.suggestions("me", 10) == [("x", 1)]
+
+
+def test_remove_friendship():
+    graph = make_graph(("me", "a"), ("other", "a"), ("a", "x"))
+
+    graph.remove_friendship("a", "other")
+    graph.remove_friendship("me", "unknown")
+
+    assert graph.mutual_friends("me", "other") == []
+    assert graph.suggestions("me", 10) == [("x", 1)]
+    assert graph.stats()["edges"] == 2
+
+
+@pytest.mark.asyncio
+async def test_publish_applies_changes_locally(redis):
+    graph = make_graph(("a", "x"))
+
+    await graph.publish("add", "me", ["a", "b"])
+    await graph.publish("remove", "me", ["b"])
+
+    assert graph.suggestions("me", 10) == [("x", 1)]
+    assert graph.stats()["edges"] == 2
+
+
+@pytest.mark.asyncio
+async def test_suggestions_are_unavailable_without_the_graph(redis):
+    assert not friend_graph.ready
+    with pytest.raises(AppError) as error:
+        await UserService(db=None).get_friend_suggestions(uuid4(), 10)
+
+    assert error.value.status_code == 503
@@ -0,0 +1,92 @@
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.user import FriendsBulkRequest
+from app.services.user_service import UserService
+from app.settings import settings
+
+
+class FakeRepository:
+    """Just the queries update_friends_bulk runs, with the writes recorded."""
+
+    def __init__(self, user_ids=()):
+        self.user_ids = set(user_ids)
+        self.added = []
+        self.deleted = []
+
+    async def get_existing_user_ids(self, user_ids):
+        return [user_id for user_id in user_ids if user_id in self.user_ids]
+
+    async def add_friends(self, user_id, friend_ids):
+        self.added.append(list(friend_ids))
+
+    async def delete_friends(self, user_id, friend_ids):
+        self.deleted.append(list(friend_ids))
+
+
+def make_service(repository: FakeRepository) -> UserService:
+    service = UserService(db=None)
+    service.repository = repository
+    return service
+
+
+@pytest.mark.asyncio
+async def test_bulk_add_dedups_and_reports_unknown_users(redis):
+    me, known, other, unknown = uuid4(), uuid4(), uuid4(), uuid4()
+    repository = FakeRepository(user_ids=[known, other])
+    service = make_service(repository)
+    await service.cache.set_friend_ids(me, [])
+
+    response = await service.update_friends_bulk(
+        me,
+        FriendsBulkRequest(action="add", user_ids=[known, unknown, known, me, other]),
+    )
+
+    # Duplicates and the caller are dropped, the request order is kept
+    assert response.updated == [known, other]
+    assert response.not_found == [unknown]
+    assert repository.added == [[known, other]]
+    assert set(await service.cache.get_friend_ids(me)) == {known, other}
+
+
+@pytest.mark.asyncio
+async def test_bulk_remove_checks_the_cached_friend_set(redis):
+    me, friend, stranger = uuid4(), uuid4(), uuid4()
+    repository = FakeRepository()
+    service = make_service(repository)
+    await service.cache.set_friend_ids(me, [friend])
+
+    response = await service.update_friends_bulk(
+        me, FriendsBulkRequest(action="remove", user_ids=[stranger, friend])
+    )
+
+    assert response.updated == [friend]
+    assert response.not_found == [stranger]
+    assert repository.deleted == [[friend]]
+    assert await service.cache.get_friend_ids(me) == []
+
+
+@pytest.mark.asyncio
+async def test_bulk_without_matches_writes_nothing(redis):
+    me, stranger = uuid4(), uuid4()
+    repository = FakeRepository()
+    service = make_service(repository)
+    await service.cache.set_friend_ids(me, [])
+
+    response = await service.update_friends_bulk(
+        me, FriendsBulkRequest(action="remove", user_ids=[stranger])
+    )
+
+    assert response.updated == []
+    assert response.not_found == [stranger]
+    assert repository.deleted == []
+
+
+def test_request_caps_the_number_of_ids():
+    user_ids = [uuid4() for _ in range(settings.FRIENDS_BULK_MAX_SIZE + 1)]
+
+    # Rejected while parsing, before the service dedups anything
+    with pytest.raises(ValidationError):
+        FriendsBulkRequest(action="add", user_ids=user_ids)
@@ -0,0 +1,86 @@
+import time
+
+import jwt
+import pytest
+
+from app.core.exceptions import AppError
+from app.core.jwt_token import VerifiedTokenCache, generate_jwt_token
+
+SECRET = "test-secret-key-of-at-least-32-bytes"
+ALGORITHM = "HS256"
+
+
+def make_token(user_id: str = "1", expiration_time: int = 3600) -> str:
+    return generate_jwt_token({"user_id": user_id}, SECRET, ALGORITHM, expiration_time)
+
+
+def test_verified_token_is_served_from_cache():
+    cache = VerifiedTokenCache(max_size=10)
+    token = make_token()
+
+    first = cache.get_data(token, SECRET, ALGORITHM)
+    first["user_id"] = "changed"
+    second = cache.get_data(token, SECRET, ALGORITHM)
+
+    # Callers get a copy, the cached payload stays intact
+    assert second["user_id"] == "1"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entry_is_not_served_after_exp(monkeypatch):
+    cache = VerifiedTokenCache(max_size=10)
+    token = make_token()
+    expires_at = cache.get_data(token, SECRET, ALGORITHM)["exp"]
+
+    monkeypatch.setattr(time, "time", lambda: expires_at + 1)
+    cache.get_data(token, SECRET, ALGORITHM)
+
+    # Verified again instead of being answered from the cache
+    assert cache.stats()["hits"] == 0
+    assert cache.stats()["misses"] == 2
+
+
+def test_expired_and_invalid_tokens_are_rejected_and_not_cached():
+    cache = VerifiedTokenCache(max_size=10)
+
+    with pytest.raises(AppError) as error:
+        cache.get_data(make_token(expiration_time=-1), SECRET, ALGORITHM)
+    assert error.value.status_code == 401
+
+    with pytest.raises(AppError):
+        cache.get_data(make_token(), SECRET[::-1], ALGORITHM)
+
+    assert cache.stats()["size"] == 0
+
+
+def test_tokens_without_exp_are_not_cached():
+    cache = VerifiedTokenCache(max_size=10)
+    token = jwt.encode({"user_id": "1"}, SECRET, algorithm=ALGORITHM)
+
+    assert cache.get_data(token, SECRET, ALGORITHM) == {"user_id": "1"}
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_is_bounded():
+    cache = VerifiedTokenCache(max_size=2)
+    tokens = [make_token(str(i)) for i in range(3)]
+    for token in tokens:
+        cache.get_data(token, SECRET, ALGORITHM)
+
+    cache.get_data(tokens[0], SECRET, ALGORITHM)
+
+    assert cache.stats()["size"] == 2
+    # The oldest token was evicted and verified again
+    assert cache.stats()["hits"] == 0
+
+
+def test_zero_size_disables_the_cache():
+    cache = VerifiedTokenCache(max_size=0)
+    token = make_token()
+
+    cache.get_data(token, SECRET, ALGORITHM)
+    cache.get_data(token, SECRET, ALGORITHM)
+
+    assert cache.stats()["hits"] == 0
+    assert cache.stats()["size"] == 0
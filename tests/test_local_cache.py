@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.local_cache import INVALIDATION_CHANNEL, MISSING, LocalCache
+
+
+def make_cache(**kwargs) -> LocalCache:
+    options = {"enabled": True, "max_size": 3, "ttl": 60.0}
+    return LocalCache(**{**options, **kwargs})
+
+
+def test_get_and_set_variants():
+    cache = make_cache()
+    cache.set("feed:1", ["a"], variant="0:10")
+    cache.set("post:1", None)
+
+    assert cache.get("feed:1", "0:10") == ["a"]
+    assert cache.get("feed:1", "10:10") is MISSING
+    # None is a cached value, not a miss
+    assert cache.get("post:1") is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used():
+    cache = make_cache()
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    cache.get("a")
+
+    cache.set("d", "d")
+
+    assert cache.get("b") is MISSING
+    assert [cache.get(key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 3
+
+
+def test_entries_expire(monkeypatch):
+    cache = make_cache(ttl=5.0)
+    cache.set("post:1", "body")
+    now = time.monotonic()
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+
+    assert cache.get("post:1") is MISSING
+    assert cache.stats()["size"] == 0
+
+
+def test_invalidate_drops_every_variant():
+    cache = make_cache()
+    cache.set("feed:1", "page 1", variant="0:10")
+    cache.set("feed:1", "page 2", variant="10:10")
+    cache.set("feed:2", "other")
+
+    cache.invalidate(["feed:1"])
+
+    assert cache.get("feed:1", "0:10") is MISSING
+    assert cache.get("feed:1", "10:10") is MISSING
+    assert cache.get("feed:2") == "other"
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_disabled_cache_stores_nothing():
+    cache = make_cache(enabled=False)
+    cache.set("post:1", "body")
+
+    assert cache.get("post:1") is MISSING
+
+
+@pytest.mark.asyncio
+async def test_invalidations_reach_other_instances(redis):
+    publisher, listener = make_cache(), make_cache()
+    task = asyncio.create_task(listener.listen_for_invalidations())
+    try:
+        while not (await redis.pubsub_numsub(INVALIDATION_CHANNEL))[0][1]:
+            await asyncio.sleep(0.01)
+        publisher.set("feed:1", "page")
+        listener.set("feed:1", "page")
+        listener.set("feed:2", "page")
+
+        await publisher.publish_invalidation(["feed:1"])
+        for _ in range(100):
+            if listener.get("feed:1") is MISSING:
+                break
+            await asyncio.sleep(0.01)
+
+        assert publisher.get("feed:1") is MISSING
+        assert listener.get("feed:1") is MISSING
+        assert listener.get("feed:2") == "page"
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
@@ -0,0 +1,125 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.messages_client import MessagesClient, _discard
+from app.settings import settings
+
+
+def make_client(handler) -> MessagesClient:
+    client = MessagesClient()
+    client.client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://messages"
+    )
+    return client
+
+
+def ok() -> httpx.Response:
+    return httpx.Response(200, stream=httpx.ByteStream(b"[]"))
+
+
+@pytest.fixture
+def hedging(monkeypatch):
+    monkeypatch.setattr(settings, "MESSAGES_HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "MESSAGES_HEDGE_MIN_DELAY", 0.01)
+
+
+@pytest.mark.asyncio
+async def test_response_holds_in_flight_slot_until_closed():
+    client = make_client(lambda request: ok())
+
+    response = await client._request("GET", "/list")
+    assert client.requests_in_flight == 1
+
+    assert await response.aread() == b"[]"
+    await response.aclose()
+    assert client.requests_in_flight == 0
+    assert client.peak_in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_over_slow_first_attempt(hedging):
+    attempts = []
+    loser_cancelled = asyncio.Event()
+
+    async def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                loser_cancelled.set()
+                raise
+        return ok()
+
+    client = make_client(handler)
+    client.latencies.p95 = 0.01
+
+    response = await client._hedged_request("GET", "/list")
+
+    assert len(attempts) == 2
+    assert client.hedges == 1
+    assert client.hedges_won == 1
+    await asyncio.wait_for(loser_cancelled.wait(), 1)
+    await asyncio.sleep(0)
+    # Only the winner's response is still open
+    assert client.requests_in_flight == 1
+    await response.aclose()
+    assert client.requests_in_flight == 0
+    # A cancelled attempt is not a failure of the service
+    assert client.breaker.stats()["consecutive_failures"] == 0
+
+
+@pytest.mark.asyncio
+async def test_fast_first_attempt_is_not_hedged(hedging):
+    attempts = []
+
+    async def handler(request):
+        attempts.append(request)
+        return ok()
+
+    client = make_client(handler)
+    client.latencies.p95 = 1.0
+
+    response = await client._hedged_request("GET", "/list")
+    await response.aclose()
+
+    assert len(attempts) == 1
+    assert client.hedges == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_first_attempt_lets_hedge_win(hedging):
+    attempts = []
+
+    async def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            await asyncio.sleep(0.05)
+            raise httpx.ConnectError("refused", request=request)
+        await asyncio.sleep(0.1)
+        return ok()
+
+    client = make_client(handler)
+    client.latencies.p95 = 0.01
+
+    response = await client._hedged_request("GET", "/list")
+    await response.aclose()
+
+    assert client.hedges_won == 1
+    assert client.requests_in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_discard_closes_finished_loser():
+    client = make_client(lambda request: ok())
+    task = asyncio.create_task(client._request("GET", "/list"))
+    await task
+    assert client.requests_in_flight == 1
+
+    _discard(task)
+    await asyncio.sleep(0)
+
+    assert task.result().is_closed
+    assert client.requests_in_flight == 0
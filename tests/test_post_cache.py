@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.core.local_cache import MISSING
+from app.services.cache_service import CacheService
+
+
+def make_post(text: str = "hello") -> dict:
+    return {
+        "id": str(uuid4()),
+        "text": text,
+        "author_user_id": str(uuid4()),
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+@pytest.mark.asyncio
+async def test_newer_version_replaces_older(redis):
+    cache = CacheService()
+    post = make_post()
+    created_at = post["created_at"]
+    await cache.write_post(post, created_at)
+
+    edited_at = created_at + timedelta(seconds=1)
+    await cache.write_post({**post, "text": "edited"}, edited_at)
+    # A slower edit that read the row earlier loses
+    await cache.write_post({**post, "text": "stale"}, created_at)
+
+    cached = await cache.get_post_from_cache(post["id"])
+    assert cached["text"] == "edited"
+
+
+@pytest.mark.asyncio
+async def test_tombstone_is_not_overwritten_by_older_edit(redis):
+    cache = CacheService()
+    post = make_post()
+    created_at = post["created_at"]
+    await cache.write_post(post, created_at)
+
+    await cache.tombstone_post(post["id"], created_at + timedelta(seconds=2))
+    edited_at = created_at + timedelta(seconds=1)
+    await cache.write_post({**post, "text": "edited"}, edited_at)
+
+    assert await cache.get_post_from_cache(post["id"]) is None
+
+
+@pytest.mark.asyncio
+async def test_fills_never_replace_existing_entries(redis):
+    cache = CacheService()
+    post, deleted = make_post(), make_post()
+    await cache.write_post({**post, "text": "edited"}, post["created_at"])
+    await cache.tombstone_post(deleted["id"], deleted["created_at"])
+
+    # A reader that loaded the old rows from a lagging replica
+    await cache.set_posts_to_cache([post, deleted])
+    await cache.set_post_not_found([post["id"]])
+
+    assert (await cache.get_post_from_cache(post["id"]))["text"] == "edited"
+    assert await cache.get_post_from_cache(deleted["id"]) is None
+
+
+@pytest.mark.asyncio
+async def test_missing_deleted_and_unknown_posts(redis):
+    cache = CacheService()
+    post, unknown_id = make_post(), str(uuid4())
+    await cache.write_post(post, post["created_at"])
+
+    assert await cache.get_post_from_cache(str(uuid4())) is MISSING
+
+    await cache.set_post_not_found([unknown_id])
+    cached = await cache.get_posts_from_cache([post["id"], unknown_id, str(uuid4())])
+
+    # Unknown posts are told apart from posts that are just not cached
+    assert cached == {post["id"]: cached[post["id"]], unknown_id: None}
+    assert cached[post["id"]]["text"] == "hello"
+
+
+@pytest.mark.asyncio
+async def test_created_post_replaces_not_found_entry(redis):
+    cache = CacheService()
+    post = make_post()
+    await cache.set_post_not_found([post["id"]])
+
+    await cache.write_post(post, post["created_at"])
+
+    assert (await cache.get_post_from_cache(post["id"]))["text"] == "hello"
@@ -0,0 +1,88 @@
+import pytest
+from pydantic import ValidationError
+
+from app.core.exceptions import AppError
+from app.core.rate_limiter import rate_limiter
+from app.core.redis_client import redis_client
+from app.settings import AppSettings
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+    return rate_limiter
+
+
+@pytest.mark.asyncio
+async def test_allows_burst_then_rejects_with_retry_after(redis, limiter):
+    for _ in range(5):
+        await limiter.check("login", "1.2.3.4", "5/60")
+
+    with pytest.raises(AppError) as error:
+        await limiter.check("login", "1.2.3.4", "5/60")
+
+    assert error.value.status_code == 429
+    # One request is allowed every 60 / 5 seconds
+    assert 11 <= int(error.value.headers["Retry-After"]) <= 12
+
+
+@pytest.mark.asyncio
+async def test_rejected_requests_do_not_use_the_limit(redis, limiter):
+    for _ in range(2):
+        await limiter.check("login", "1.2.3.4", "2/60")
+    for _ in range(3):
+        with pytest.raises(AppError):
+            await limiter.check("login", "1.2.3.4", "2/60")
+
+    tat = int(await redis.get("ratelimit:login:1.2.3.4"))
+    now_seconds, now_micros = await redis.time()
+    # Two requests booked, no more: the next slot is at most a period away
+    assert tat - (now_seconds * 1_000_000 + now_micros) <= 60_000_000
+
+
+@pytest.mark.asyncio
+async def test_limits_are_per_name_and_key(redis, limiter):
+    await limiter.check("login", "1.2.3.4", "1/60")
+
+    await limiter.check("login", "5.6.7.8", "1/60")
+    await limiter.check("register", "1.2.3.4", "1/60")
+    with pytest.raises(AppError):
+        await limiter.check("login", "1.2.3.4", "1/60")
+
+
+@pytest.mark.asyncio
+async def test_cost_uses_several_units(redis, limiter):
+    await limiter.check("friend:bulk", "user", "10/60", cost=6)
+
+    with pytest.raises(AppError):
+        await limiter.check("friend:bulk", "user", "10/60", cost=6)
+    await limiter.check("friend:bulk", "user", "10/60", cost=4)
+
+
+@pytest.mark.asyncio
+async def test_cost_above_the_limit_is_a_bad_request(redis, limiter):
+    with pytest.raises(AppError) as error:
+        await limiter.check("friend:bulk", "user", "10/60", cost=11)
+
+    assert error.value.status_code == 400
+    # Not counted, the limit is untouched
+    await limiter.check("friend:bulk", "user", "10/60", cost=10)
+
+
+def test_friend_bulk_limit_must_fit_the_largest_request():
+    with pytest.raises(ValidationError):
+        AppSettings(RATE_LIMIT_FRIEND_BULK="10/60", FRIENDS_BULK_MAX_SIZE=11)
+
+
+@pytest.mark.asyncio
+async def test_disabled_limiter_allows_everything(redis):
+    for _ in range(3):
+        await rate_limiter.check("login", "1.2.3.4", "1/60")
+
+
+@pytest.mark.asyncio
+async def test_fails_open_without_redis(limiter):
+    assert redis_client.client is None
+
+    await limiter.check("login", "1.2.3.4", "1/60")
+    await limiter.check("login", "1.2.3.4", "1/60")
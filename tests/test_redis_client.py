@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from app.core import redis_client as redis_client_module
+from app.core.redis_client import redis_client
+
+CHANNEL = "test:events"
+
+
+@pytest.mark.asyncio
+async def test_listen_closes_the_connection_before_resubscribing(redis, monkeypatch):
+    sleep = asyncio.sleep
+    monkeypatch.setattr(redis_client_module.asyncio, "sleep", lambda _: sleep(0))
+    opened = []
+    pubsub = redis.pubsub
+
+    def open_pubsub():
+        opened.append(pubsub())
+        return opened[-1]
+
+    monkeypatch.setattr(redis, "pubsub", open_pubsub)
+    subscribed = asyncio.Event()
+    attempts = 0
+
+    async def on_subscribe():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise ConnectionError("lost while resyncing")
+        subscribed.set()
+
+    task = asyncio.create_task(
+        redis_client.listen(CHANNEL, lambda _: None, on_subscribe, "Test listener")
+    )
+    try:
+        await asyncio.wait_for(subscribed.wait(), timeout=1)
+
+        # The failed attempt gave its connection back, the retry holds one
+        assert [p.connection is None for p in opened] == [True, False]
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert opened[-1].connection is None
@@ -0,0 +1,49 @@
+import pytest
+
+from app.services.cache_service import CacheService
+
+USERS = [{"id": "1", "first_name": "Ivan", "second_name": "Petrov"}]
+FIRST_PAGE = "20:"
+
+
+@pytest.mark.asyncio
+async def test_search_round_trip(redis):
+    cache = CacheService()
+
+    assert await cache.get_search_from_cache("iv", "pe", FIRST_PAGE) is None
+    await cache.set_search_to_cache("iv", "pe", FIRST_PAGE, USERS)
+
+    assert await cache.get_search_from_cache("iv", "pe", FIRST_PAGE) == USERS
+    assert await cache.get_search_from_cache("iv", "pe", "20:next") is None
+    # Prefix pairs that join to the same string are different searches
+    assert await cache.get_search_from_cache("i", "vpe", FIRST_PAGE) is None
+
+
+@pytest.mark.asyncio
+async def test_later_pages_do_not_extend_the_ttl(redis):
+    cache = CacheService()
+    await cache.set_search_to_cache("iv", "pe", FIRST_PAGE, USERS)
+    key = CacheService._get_search_key("iv", "pe")
+    await redis.expire(key, 5)
+
+    await cache.set_search_to_cache("iv", "pe", "20:next", [])
+
+    assert await redis.ttl(key) <= 5
+
+
+@pytest.mark.asyncio
+async def test_new_user_drops_only_matching_searches(redis):
+    cache = CacheService()
+    matching = [("iv", "pe"), ("iva", "petrov"), ("ivan", "petr")]
+    other = [("iv", "si"), ("ig", "pe"), ("ivana", "pe")]
+    for first_name, second_name in matching + other:
+        for page in (FIRST_PAGE, "20:next"):
+            await cache.set_search_to_cache(first_name, second_name, page, [])
+
+    await cache.invalidate_searches_matching("Ivan", "Petrov")
+
+    for names in matching:
+        for page in (FIRST_PAGE, "20:next"):
+            assert await cache.get_search_from_cache(*names, page) is None
+    for names in other:
+        assert await cache.get_search_from_cache(*names, FIRST_PAGE) == []
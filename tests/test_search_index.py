@@ -0,0 +1,68 @@
+from uuid import UUID
+
+from app.services.search_index import UserSearchIndex
+
+ID_1 = "00000000-0000-0000-0000-000000000001"
+ID_2 = "00000000-0000-0000-0000-000000000002"
+ID_3 = "00000000-0000-0000-0000-000000000003"
+
+
+def make_index(*users) -> UserSearchIndex:
+    index = UserSearchIndex(enabled=True)
+    for user in users:
+        index.add(*user)
+    return index
+
+
+def test_search_orders_like_name_tuples():
+    index = make_index(
+        ("ann", "a", ID_1),
+        ("an", "z", ID_2),
+        ("anna", "b", ID_3),
+        ("an", "z", ID_1),
+    )
+
+    # A shorter first name sorts before its extensions, whatever the second name
+    assert index.search("an", "", 10) == [
+        ("an", "z", ID_1),
+        ("an", "z", ID_2),
+        ("ann", "a", ID_1),
+        ("anna", "b", ID_3),
+    ]
+
+
+def test_search_matches_both_prefixes():
+    index = make_index(
+        ("ivan", "petrov", ID_1),
+        ("ivanna", "ivanova", ID_2),
+        ("igor", "petrov", ID_3),
+    )
+
+    assert index.search("iva", "pe", 10) == [("ivan", "petrov", ID_1)]
+    assert index.search("i", "petrov", 10) == [
+        ("igor", "petrov", ID_3),
+        ("ivan", "petrov", ID_1),
+    ]
+    assert index.search("ivo", "", 10) == []
+
+
+def test_search_pages_with_limit_and_after():
+    index = make_index(
+        ("ann", "a", ID_1),
+        ("an", "z", ID_2),
+        ("anna", "b", ID_3),
+    )
+
+    first_page = index.search("an", "", 2)
+    first, second, user_id = first_page[-1]
+    second_page = index.search("an", "", 2, after=(first, second, UUID(user_id)))
+
+    assert first_page == [("an", "z", ID_2), ("ann", "a", ID_1)]
+    assert second_page == [("anna", "b", ID_3)]
+
+
+def test_add_is_idempotent():
+    index = make_index(("ivan", "petrov", ID_1))
+    index.add("ivan", "petrov", UUID(ID_1))
+
+    assert index.stats()["size"] == 1
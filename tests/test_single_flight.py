@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from app.core.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    single_flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return calls
+
+    waiters = [asyncio.create_task(single_flight.do("feed:1", load)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert single_flight.in_flight("feed:1")
+
+    release.set()
+    assert await asyncio.gather(*waiters) == [1, 1, 1]
+    assert calls == 1
+    assert not single_flight.in_flight("feed:1")
+
+    # Finished calls are not cached
+    assert await single_flight.do("feed:1", load) == 2
+
+
+@pytest.mark.asyncio
+async def test_error_reaches_every_waiter_and_key_is_forgotten():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fail():
+        await release.wait()
+        raise ValueError("db down")
+
+    waiters = [asyncio.create_task(single_flight.do("feed:1", fail)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert not single_flight.in_flight("feed:1")
+
+    async def load():
+        return "ok"
+
+    assert await single_flight.do("feed:1", load) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return "feed"
+
+    first = asyncio.create_task(single_flight.do("feed:1", load))
+    second = asyncio.create_task(single_flight.do("feed:1", load))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "feed"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_keys_are_independent():
+    single_flight = SingleFlight()
+
+    async def load(value):
+        await asyncio.sleep(0)
+        return value
+
+    results = await asyncio.gather(
+        single_flight.do("feed:1", lambda: load(1)),
+        single_flight.do("feed:2", lambda: load(2)),
+    )
+
+    assert results == [1, 2]
@@ -0,0 +1,44 @@
+from uuid import uuid4
+
+import pytest
+
+from app.core.local_cache import MISSING
+from app.services.cache_service import CacheService
+
+
+def make_user() -> dict:
+    return {"id": str(uuid4()), "first_name": "Ivan", "second_name": "Petrov"}
+
+
+@pytest.mark.asyncio
+async def test_unknown_user_is_cached_as_none(redis):
+    cache = CacheService()
+    user_id = uuid4()
+
+    assert await cache.get_user_from_cache(user_id) is MISSING
+    await cache.set_user_to_cache(user_id, None)
+
+    assert await cache.get_user_from_cache(user_id) is None
+
+
+@pytest.mark.asyncio
+async def test_new_user_replaces_negative_entry(redis):
+    cache = CacheService()
+    user = make_user()
+    # A profile read that hit a lagging replica right after registration
+    await cache.set_user_to_cache(user["id"], None)
+
+    await cache.write_user(user)
+
+    assert await cache.get_user_from_cache(user["id"]) == user
+
+
+@pytest.mark.asyncio
+async def test_negative_entry_never_hides_written_user(redis):
+    cache = CacheService()
+    user = make_user()
+    await cache.write_user(user)
+
+    await cache.set_user_to_cache(user["id"], None)
+
+    assert await cache.get_user_from_cache(user["id"]) == user